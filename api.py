@@ -0,0 +1,356 @@
+"""
+LuxBoat Due Date API - headless JSON endpoint
+=============================================
+Programmatic due date quotes for other systems (ERP, order quoting), using
+the same calculate_due_date() as the Shiny app.
+
+Run standalone:          uvicorn api:api
+Run next to the app:     uvicorn api:combined   (API under /api, app at /)
+
+POST /due-date
+    {"boats_needed": 25, "confidence_level": 0.9}
+    {"boats_needed": [10, 25, 50], "confidence_level": [0.9, 0.95, 0.99]}
+    Optional "data": [...] replaces the example data, or "dataset": "<name>"
+    picks a registry dataset (luxboat.registry, loaded from LUXBOAT_DATASETS).
+
+    A single pair returns {"result": {...}} with the calculate_due_date()
+    fields; lists (broadcast against each other) return
+    {"results": {field: [...]}} computed with the batch engine.
+
+POST /max-boats
+    {"deadline_days": 43, "confidence_level": 0.9}
+    Largest number of boats deliverable by each deadline; deadline_days and
+    confidence_level may be lists. Returns {"max_boats": ...}.
+
+POST /portfolio
+    {"orders": [10, 5, 20], "confidence_level": 0.9}
+    Due dates of orders queued on the same line, in build order;
+    confidence_level may be one value per order. Returns
+    {"results": {field: [...]}} (see luxboat.portfolio).
+
+GET /datasets
+    Registry datasets with their statistics.
+
+POST /datasets/{name}
+    {"values": [...]} appends observations (statistics are updated
+    incrementally); {"values": [...], "group": "...", "label": "..."}
+    creates the dataset if it does not exist yet. Only served when
+    LUXBOAT_API_TOKEN is set, to requests carrying
+    "Authorization: Bearer <token>". With LUXBOAT_DATASETS set, the
+    registry is saved to that file before the reply, so changes survive a
+    restart; without it they are kept in memory only.
+
+GET /metrics Prometheus counters for calls, time and caches
+             (per-call timing needs LUXBOAT_METRICS=1)
+GET /stats   cache counters, shared datasets, live figures, worker pool
+GET /health  liveness check
+"""
+
+import hashlib
+import hmac
+import json
+import math
+import os
+
+import numpy as np
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Mount, Route
+
+from app import DEFAULT_DATA, app as shiny_app, calculate_due_date
+from luxboat import (
+    RESULTS_CACHE,
+    LRUCache,
+    calculate_due_date_batch,
+    cached_due_date,
+    fingerprint,
+    max_boats_by_deadline,
+    portfolio_due_dates,
+)
+from luxboat.metrics import REGISTRY, timed
+from luxboat.plots import FIGURES
+from luxboat.registry import DATASETS, DATASETS_PATH
+from luxboat.shared import SHARED_DATA
+from luxboat.workers import WORKER_POOL
+
+try:
+    # Optional: several times faster than json for float-heavy batch replies
+    import orjson
+    _loads, _dumps = orjson.loads, orjson.dumps
+except ImportError:
+    _loads = json.loads
+
+    def _finite(value):
+        # NaN and infinities as null, like orjson (bare NaN is not JSON)
+        if isinstance(value, float) and not math.isfinite(value):
+            return None
+        if isinstance(value, dict):
+            return {k: _finite(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [_finite(v) for v in value]
+        return value
+
+    def _dumps(payload):
+        try:
+            return json.dumps(payload, allow_nan=False).encode()
+        except ValueError:
+            return json.dumps(_finite(payload)).encode()
+
+
+# Identical request bodies get the stored response bytes back (keyed with
+# the registry version, since a body can name a dataset that later grows).
+# Keys are a hash of the body and the total size is bounded; requests that
+# bring their own data are not cached, they rarely repeat.
+RESPONSE_CACHE = LRUCache(maxsize=8192, maxbytes=64 << 20)
+REGISTRY.register_cache('responses', RESPONSE_CACHE)
+
+# Secret for changing the registry; without it the registry is read-only
+API_TOKEN = os.environ.get('LUXBOAT_API_TOKEN')
+
+# Batches larger than this are computed off the event loop
+THREADPOOL_THRESHOLD = 10_000
+
+DEFAULT_KEY = fingerprint(DEFAULT_DATA)
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _parse_payload(body, fields):
+    """JSON object from body plus its numeric fields as arrays."""
+    try:
+        payload = _loads(body)
+    except ValueError:
+        raise BadRequest("request body must be JSON") from None
+    if not isinstance(payload, dict):
+        raise BadRequest("request body must be a JSON object")
+
+    missing = set(fields) - payload.keys()
+    if missing:
+        raise BadRequest(f"missing field(s): {', '.join(sorted(missing))}")
+
+    try:
+        values = [np.asarray(payload[name], dtype=float) for name in fields]
+    except (TypeError, ValueError):
+        values = None
+    # null converts to NaN
+    if values is None or not all(np.isfinite(v).all() for v in values):
+        raise BadRequest(f"{' and '.join(fields)} must be finite numbers "
+                         "or lists of finite numbers")
+    return payload, values
+
+
+def _cache_key(body):
+    return (DATASETS.version, hashlib.blake2b(body, digest_size=16).digest())
+
+
+def _cache_response(cache_key, payload, content):
+    if 'data' not in payload:
+        RESPONSE_CACHE.put(cache_key, content)
+
+
+def _require_finite(values):
+    # Constant data leaves rho_1 undefined and the due date NaN
+    if not np.isfinite(values).all():
+        raise BadRequest("the data does not determine a due date "
+                         "(it needs some variation and |rho_1| < 1)")
+
+
+def _parse_request(body):
+    payload, (boats, conf) = _parse_payload(
+        body, ('boats_needed', 'confidence_level'))
+    if np.any(boats < 1) or np.any((conf <= 0) | (conf >= 1)):
+        raise BadRequest("boats_needed must be >= 1 and confidence_level in (0, 1)")
+
+    data, data_key = _parse_data(payload)
+    return payload, data, data_key, boats, conf
+
+
+def _parse_data(payload):
+    """Dataset from the request, defaulting to the example data."""
+    data = payload.get('data')
+    if data is None and 'dataset' in payload:
+        if not isinstance(payload['dataset'], str):
+            raise BadRequest("dataset must be a dataset name")
+        dataset = DATASETS.get(payload['dataset'])
+        if dataset is None:
+            raise BadRequest(f"unknown dataset {payload['dataset']!r}")
+        # The stored statistics stand in for the raw values
+        data, data_key = dataset.acc, dataset.key
+    elif data is None:
+        data, data_key = DEFAULT_DATA, DEFAULT_KEY
+    else:
+        try:
+            data = np.asarray(data, dtype=float)
+        except (TypeError, ValueError):
+            raise BadRequest("data must be a list of numbers") from None
+        if data.ndim != 1 or data.size < 3 or not np.isfinite(data).all():
+            raise BadRequest("data must be a list of at least 3 finite numbers")
+        data_key = None
+
+    return data, data_key
+
+
+def _compute(data, data_key, boats, conf):
+    """Response payload for a parsed request."""
+    if boats.ndim == 0 and conf.ndim == 0:
+        result = cached_due_date(calculate_due_date, data, float(boats),
+                                 float(conf), data_key=data_key)
+        _require_finite(result['due_date_hours'])
+        return {'result': {k: float(v) for k, v in result.items()}}
+
+    try:
+        results = calculate_due_date_batch(data, boats, conf)
+    except ValueError as err:
+        raise BadRequest(str(err)) from None
+    _require_finite(results['due_date_hours'])
+    return {'results': {name: results[name].tolist()
+                        for name in results.dtype.names}}
+
+
+@timed(name='api_due_date')
+async def due_date(request):
+    body = await request.body()
+    cache_key = _cache_key(body)
+    cached = RESPONSE_CACHE.get(cache_key)
+    if cached is not None:
+        return Response(cached, media_type='application/json')
+
+    try:
+        payload, data, data_key, boats, conf = _parse_request(body)
+        if max(boats.size, conf.size) > THREADPOOL_THRESHOLD:
+            response = await run_in_threadpool(_compute, data, data_key, boats, conf)
+        else:
+            response = _compute(data, data_key, boats, conf)
+    except BadRequest as err:
+        return JSONResponse({'error': str(err)}, status_code=400)
+
+    content = _dumps(response)
+    _cache_response(cache_key, payload, content)
+    return Response(content, media_type='application/json')
+
+
+@timed(name='api_max_boats')
+async def max_boats(request):
+    body = await request.body()
+    cache_key = _cache_key(body)
+    cached = RESPONSE_CACHE.get(cache_key)
+    if cached is not None:
+        return Response(cached, media_type='application/json')
+
+    try:
+        payload, (deadline, conf) = _parse_payload(
+            body, ('deadline_days', 'confidence_level'))
+        if np.any((conf <= 0) | (conf >= 1)):
+            raise BadRequest("confidence_level must be in (0, 1)")
+        data, _ = _parse_data(payload)
+        boats = max_boats_by_deadline(data, deadline, conf)
+    except ValueError as err:
+        # BadRequest or a broadcasting error
+        return JSONResponse({'error': str(err)}, status_code=400)
+
+    content = _dumps({'max_boats': np.asarray(boats).tolist()})
+    _cache_response(cache_key, payload, content)
+    return Response(content, media_type='application/json')
+
+
+@timed(name='api_portfolio')
+async def portfolio(request):
+    body = await request.body()
+    cache_key = _cache_key(body)
+    cached = RESPONSE_CACHE.get(cache_key)
+    if cached is not None:
+        return Response(cached, media_type='application/json')
+
+    try:
+        payload, (orders, conf) = _parse_payload(
+            body, ('orders', 'confidence_level'))
+        if np.any((conf <= 0) | (conf >= 1)):
+            raise BadRequest("confidence_level must be in (0, 1)")
+        data, _ = _parse_data(payload)
+        results = portfolio_due_dates(data, orders, conf)
+        _require_finite(results['due_date_hours'])
+    except ValueError as err:
+        # BadRequest, invalid orders or a broadcasting error
+        return JSONResponse({'error': str(err)}, status_code=400)
+
+    content = _dumps({'results': {name: results[name].tolist()
+                                  for name in results.dtype.names}})
+    _cache_response(cache_key, payload, content)
+    return Response(content, media_type='application/json')
+
+
+async def list_datasets(request):
+    return JSONResponse({'datasets': [
+        {'name': d.name, 'group': d.group, 'label': d.label, 'key': d.key,
+         **{k: float(v) for k, v in d.summary()._asdict().items()}}
+        for d in DATASETS
+    ]})
+
+
+@timed(name='api_append_dataset')
+async def append_dataset(request):
+    scheme, _, token = request.headers.get('authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not hmac.compare_digest(
+            token.encode(), API_TOKEN.encode()):
+        return JSONResponse({'error': 'unauthorized'}, status_code=401,
+                            headers={'WWW-Authenticate': 'Bearer'})
+
+    name = request.path_params['name']
+    try:
+        payload, (values,) = _parse_payload(await request.body(), ('values',))
+        if name in DATASETS:
+            dataset = DATASETS.append(name, values)
+        else:
+            dataset = DATASETS.add(name, values, payload.get('group', ''),
+                                   payload.get('label'))
+    except ValueError as err:
+        return JSONResponse({'error': str(err)}, status_code=400)
+    if DATASETS_PATH:
+        # Write-through: the whole registry, off the event loop
+        await run_in_threadpool(DATASETS.save, DATASETS_PATH)
+    return JSONResponse({'name': dataset.name, 'n': len(dataset),
+                         'key': dataset.key})
+
+
+async def cache_stats(request):
+    return JSONResponse({
+        'responses': RESPONSE_CACHE.stats(),
+        'results': RESULTS_CACHE.stats(),
+        'shared_data': SHARED_DATA.stats(),
+        'figures': FIGURES.stats(),
+        'workers': WORKER_POOL.stats(),
+    })
+
+
+async def metrics(request):
+    return PlainTextResponse(REGISTRY.prometheus(),
+                             media_type='text/plain; version=0.0.4')
+
+
+async def health(request):
+    return JSONResponse({'status': 'ok'})
+
+
+routes = [
+    Route('/due-date', due_date, methods=['POST']),
+    Route('/max-boats', max_boats, methods=['POST']),
+    Route('/portfolio', portfolio, methods=['POST']),
+    Route('/datasets', list_datasets),
+    Route('/metrics', metrics),
+    Route('/stats', cache_stats),
+    Route('/health', health),
+]
+if API_TOKEN:
+    routes.append(Route('/datasets/{name}', append_dataset, methods=['POST']))
+
+# Standalone API
+api = Starlette(routes=routes)
+
+# API mounted under /api next to the Shiny app
+combined = Starlette(routes=[
+    Mount('/api', app=api),
+    Mount('/', app=shiny_app),
+])
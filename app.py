@@ -4,11 +4,35 @@ LuxBoat Due Date Calculator - Shiny for Python
 Students can edit this code directly in the browser!
 """
 
-from shiny import App, render, ui, reactive
+import asyncio
+import functools
+
+from shiny import App, render, ui, reactive, req
+from shiny.types import SafeException
 import numpy as np
-from scipy import stats
-import matplotlib.pyplot as plt
-import pandas as pd
+
+# pandas and matplotlib are imported where they are first used,
+# so a new worker starts without paying for them up front
+
+from luxboat import RESULTS_CACHE, cached_due_date, summarize
+from luxboat.plots import cached_png, png_data_uri
+from luxboat.charts import PLOT_BACKEND, SCRIPT_PATH, Chart, cached_chart
+from luxboat.coalesce import Offloaded, Settled
+from luxboat.acf import variance_multiplier as acf_variance_multiplier
+from luxboat.bootstrap import DEFAULT_RESAMPLES, bootstrap_due_dates, interval
+from luxboat.ingest import detect_format, load_file
+from luxboat.inverse import max_boats_by_deadline
+from luxboat.kernels import FUSED_MIN_SIZE
+from luxboat.metrics import timed
+from luxboat.parsing import DataParseError, parse_times
+from luxboat.portfolio import portfolio_due_dates
+from luxboat.registry import DATASETS
+from luxboat.shared import SHARED_DATA
+from luxboat.rolling import EWMAccumulator, rolling_due_dates
+from luxboat.normal import pdf as norm_pdf, z_for_confidence
+from luxboat.simulate import MonteCarloEngine
+from luxboat.surface import shared_surface
+from luxboat.workers import SESSION_JOBS
 
 # Default data from LuxBoat case study
 DEFAULT_DATA = [
@@ -17,6 +41,16 @@ DEFAULT_DATA = [
     34, 51, 48, 41.5, 39.5, 36, 31, 36, 41, 34
 ]
 
+# Bootstrap work allowed per confidence plot (resamples x observations)
+BOOTSTRAP_MAX_ELEMENTS = 20_000_000
+
+# How often open sessions look for registry changes (new datasets, appends)
+DATASETS_POLL_SECONDS = 5
+
+# Read-only copy every session shares (see luxboat/shared.py); holding it
+# here keeps it in the shared store for the life of the process
+DEFAULT_SHARED = SHARED_DATA.intern(DEFAULT_DATA)
+
 # =============================================================================
 # STUDENT EXERCISE SECTION - MODIFY THE CODE BELOW!
 # =============================================================================
@@ -54,28 +88,53 @@ def calculate_autocorrelation(data):
     return autocorr
 
 
-def calculate_due_date(data, boats_needed, confidence_level):
+def calculate_due_date(data, boats_needed, confidence_level, variance_mode="lag1",
+                       data_key=None):
     """
     TODO #3: Calculate due date with confidence interval
     Main calculation combining all concepts
+
+    data can be a list of times or a luxboat accumulator
+    (StatsAccumulator, WindowedAccumulator or EWMAccumulator)
+    variance_mode "lag1" uses rho_1 only; "bartlett", "parzen" or
+    "truncated" use the full autocorrelation function (luxboat/acf.py),
+    computed once per data_key (the content hash if not given)
     """
-    # Step 1: Basic statistics
-    mean_time, variance, std_dev = calculate_statistics(data)
-    
-    # Step 2: Autocorrelation
-    rho_1 = calculate_autocorrelation(data)
+    streaming = hasattr(data, 'summary')
+    if streaming:
+        # Streaming data: the accumulator already holds Steps 1 and 2
+        _, mean_time, variance, std_dev, rho_1 = data.summary()
+    elif len(data) >= FUSED_MIN_SIZE:
+        # Very long series: Steps 1 and 2 in one fused pass over memory
+        # (luxboat/kernels.py) instead of one pass per statistic
+        _, mean_time, variance, std_dev, rho_1 = summarize(data)
+    else:
+        # Step 1: Basic statistics
+        mean_time, variance, std_dev = calculate_statistics(data)
+        
+        # Step 2: Autocorrelation
+        rho_1 = calculate_autocorrelation(data)
     
     # Step 3: Calculate mean time for b boats
     mu_b = boats_needed * mean_time
     
     # Step 4: Calculate variance with autocorrelation adjustment
     # Formula: [(1 + rho) / (1 - rho)] * b * variance
-    variance_multiplier = (1 + rho_1) / (1 - rho_1)
+    if variance_mode == "lag1":
+        variance_multiplier = (1 + rho_1) / (1 - rho_1)
+    elif streaming:
+        raise ValueError("full-ACF variance needs the raw data, not an accumulator")
+    else:
+        # Use every lag: S^2 * [b + 2 * sum (b - k) * w_k * rho_k] / (b * S^2)
+        variance_multiplier = acf_variance_multiplier(data, boats_needed,
+                                                      window=variance_mode,
+                                                      data_key=data_key)
     sigma_squared_b = variance_multiplier * boats_needed * variance
     sigma_b = np.sqrt(sigma_squared_b)
     
     # Step 5: Get z-score for confidence level
-    z_score = stats.norm.ppf(confidence_level)
+    # (same value as scipy.stats.norm.ppf, from a precomputed table)
+    z_score = z_for_confidence(confidence_level)
     
     # Step 6: Calculate due date in hours
     # Formula: T_due = mu_b + z_score * sigma_b
@@ -105,9 +164,185 @@ def calculate_due_date(data, boats_needed, confidence_level):
 # =============================================================================
 
 
+# =============================================================================
+# PLOT DRAWING - change colors, bins and labels here!
+# =============================================================================
+
+def draw_histogram(ax, data):
+    """Distribution of inter-throughput times"""
+    mean_time = np.mean(data)
+    ax.hist(data, bins=12, edgecolor='black', alpha=0.7, color='steelblue')
+    ax.axvline(mean_time, color='red', linestyle='--', linewidth=2,
+               label=f"Mean: {mean_time:.1f} hrs")
+    ax.set_xlabel('Inter-Throughput Time (hours)', fontsize=11)
+    ax.set_ylabel('Frequency', fontsize=11)
+    ax.set_title('Distribution of Inter-Throughput Times', fontsize=13, fontweight='bold')
+    ax.legend(fontsize=10)
+    ax.grid(True, alpha=0.3)
+
+
+def draw_confidence(ax, results, conf, bands=None):
+    """
+    Normal curve for the order with the confidence area shaded
+
+    bands: optional bootstrap intervals {'mu_b': (low, high),
+    'due_date_hours': (low, high)} drawn as error bars
+    """
+    mu = results['mu_b']
+    sigma = results['sigma_b']
+    due = results['due_date_hours']
+    
+    # Create x-axis range
+    x = np.linspace(mu - 4*sigma, mu + 4*sigma, 1000)
+    y = norm_pdf(x, mu, sigma)
+    
+    # Plot distribution
+    ax.plot(x, y, 'b-', linewidth=2, label='Distribution')
+    
+    # Shade confidence area
+    x_fill = x[x <= due]
+    y_fill = y[x <= due]
+    ax.fill_between(x_fill, y_fill, alpha=0.3, color='green',
+                    label=f'{conf*100:.0f}% confidence area')
+    
+    # Add vertical lines
+    ax.axvline(mu, color='orange', linestyle='--', linewidth=2,
+              label=f"Average: {mu:.0f} hrs")
+    ax.axvline(due, color='red', linestyle='--', linewidth=2,
+              label=f"Due date: {due:.0f} hrs")
+    
+    # Estimation uncertainty: where the lines could be with other samples
+    if bands:
+        peak = norm_pdf(mu, mu, sigma)
+        for field, center, height, color, name in (
+                ('mu_b', mu, 0.35, 'orange', 'Average'),
+                ('due_date_hours', due, 0.45, 'red', 'Due date')):
+            low, high = bands[field]
+            # The estimate can lie outside its percentile range (bias)
+            xerr = [[max(center - low, 0)], [max(high - center, 0)]]
+            ax.errorbar(center, peak * height, xerr=xerr,
+                        fmt='o', color=color, capsize=6, linewidth=2,
+                        label=f"{name} 90% bootstrap range: {low:.0f}-{high:.0f} hrs")
+    
+    ax.set_xlabel('Time to Complete (hours)', fontsize=11)
+    ax.set_ylabel('Probability Density', fontsize=11)
+    ax.set_title(f'Due Date with {conf*100:.0f}% Confidence', fontsize=13, fontweight='bold')
+    ax.legend(fontsize=10)
+    ax.grid(True, alpha=0.3)
+
+
+def draw_timeseries(ax, data):
+    """Inter-throughput times in production order"""
+    mean_time = np.mean(data)
+    ax.plot(range(1, len(data)+1), data, marker='o', linestyle='-',
+            color='steelblue', linewidth=1.5, markersize=6)
+    ax.axhline(mean_time, color='red', linestyle='--', linewidth=2,
+              label=f"Mean: {mean_time:.1f} hrs")
+    ax.set_xlabel('Observation Number', fontsize=11)
+    ax.set_ylabel('Inter-Throughput Time (hours)', fontsize=11)
+    ax.set_title('Time Series of Inter-Throughput Times', fontsize=13, fontweight='bold')
+    ax.legend(fontsize=10)
+    ax.grid(True, alpha=0.3)
+
+
+def draw_rolling(ax, rolling, label):
+    """Due date quoted after each observation, with the average for comparison"""
+    x = np.arange(1, len(rolling) + 1)
+    ax.plot(x, rolling['due_date_days'], color='red', linewidth=2,
+            label='Due date')
+    ax.plot(x, rolling['average_days'], color='orange', linestyle='--',
+            linewidth=1.5, label='Average')
+    ax.set_xlabel('Observation Number', fontsize=11)
+    ax.set_ylabel('Quoted Time (days)', fontsize=11)
+    ax.set_title(f'Quote After Each Observation ({label})', fontsize=13,
+                 fontweight='bold')
+    ax.legend(fontsize=10)
+    ax.grid(True, alpha=0.3)
+
+
+# Client-side versions of the plots above, used when the deployment sets
+# LUXBOAT_PLOT_BACKEND=svg: only these numbers are sent to the browser
+
+def histogram_chart(data):
+    counts, edges = np.histogram(data, bins=12)
+    mean_time = np.mean(data)
+    return (Chart('Distribution of Inter-Throughput Times',
+                  'Inter-Throughput Time (hours)', 'Frequency', figsize=(10, 6))
+            .bars(edges, counts, 'steelblue')
+            .vline(mean_time, 'red', f"Mean: {mean_time:.1f} hrs"))
+
+
+def confidence_chart(results, conf, bands=None):
+    mu = results['mu_b']
+    sigma = results['sigma_b']
+    due = results['due_date_hours']
+    x = np.linspace(mu - 4*sigma, mu + 4*sigma, 200)
+    y = norm_pdf(x, mu, sigma)
+    chart = (Chart(f'Due Date with {conf*100:.0f}% Confidence',
+                   'Time to Complete (hours)', 'Probability Density', figsize=(12, 6))
+             .area(x[x <= due], y[x <= due], 'green', f'{conf*100:.0f}% confidence area')
+             .line(x, y, 'blue', 'Distribution')
+             .vline(mu, 'orange', f"Average: {mu:.0f} hrs")
+             .vline(due, 'red', f"Due date: {due:.0f} hrs"))
+    if bands:
+        peak = norm_pdf(mu, mu, sigma)
+        for field, center, height, color, name in (
+                ('mu_b', mu, 0.35, 'orange', 'Average'),
+                ('due_date_hours', due, 0.45, 'red', 'Due date')):
+            low, high = bands[field]
+            chart.errorbar(center, peak * height, low, high, color,
+                           f"{name} 90% bootstrap range: {low:.0f}-{high:.0f} hrs")
+    return chart
+
+
+def timeseries_chart(data):
+    mean_time = np.mean(data)
+    return (Chart('Time Series of Inter-Throughput Times', 'Observation Number',
+                  'Inter-Throughput Time (hours)', figsize=(12, 5))
+            .line(np.arange(1, len(data) + 1), data, 'steelblue', width=1.5, markers=True)
+            .hline(mean_time, 'red', f"Mean: {mean_time:.1f} hrs"))
+
+
+def rolling_chart(rolling, label):
+    x = np.arange(1, len(rolling) + 1)
+    return (Chart(f'Quote After Each Observation ({label})', 'Observation Number',
+                  'Quoted Time (days)', figsize=(12, 5))
+            .line(x, rolling['due_date_days'], 'red', 'Due date')
+            .line(x, rolling['average_days'], 'orange', 'Average', width=1.5, dash=True))
+
+
+def draw_surface(ax, surface, field):
+    """Heatmap of a result field over boats x confidence"""
+    labels = {'due_date_days': 'Due date (days)', 'safety_time_days': 'Safety time (days)'}
+    grid = surface.field(field)
+    image = ax.imshow(grid, origin='lower', aspect='auto', cmap='viridis',
+                      extent=[surface.confidence_pct[0] - 0.5, surface.confidence_pct[-1] + 0.5,
+                              surface.boats[0] - 0.5, surface.boats[-1] + 0.5])
+    ax.figure.colorbar(image, ax=ax, label=labels.get(field, field))
+    ax.set_xlabel('Confidence level (%)', fontsize=11)
+    ax.set_ylabel('Number of boats', fontsize=11)
+    ax.set_title(f'{labels.get(field, field)} for Every Slider Position',
+                 fontsize=13, fontweight='bold')
+
+
+def data_source_choices():
+    """Built-in sources plus one option group per registry group"""
+    choices = {
+        "default": "Use Example Data",
+        "custom": "Enter Custom Data",
+        "upload": "Upload a File"
+    }
+    for group in DATASETS.groups():
+        choices[group or "Datasets"] = {
+            f"dataset:{d.name}": d.label for d in DATASETS if d.group == group
+        }
+    return choices
+
+
 # UI Definition
 app_ui = ui.page_fluid(
     ui.panel_title("🚤 LuxBoat Due Date Calculator"),
+    ui.include_js(SCRIPT_PATH) if PLOT_BACKEND == "svg" else None,
     
     ui.markdown("""
     **Interactive Calculator** - Modify the code and see results update!
@@ -120,19 +355,28 @@ app_ui = ui.page_fluid(
             ui.input_select(
                 "data_source",
                 "Data Source:",
-                choices={"default": "Use Example Data", "custom": "Enter Custom Data"}
+                choices=data_source_choices()
             ),
             
             ui.panel_conditional(
                 "input.data_source === 'custom'",
                 ui.input_text_area(
                     "custom_data",
-                    "Inter-throughput times (comma-separated):",
+                    "Inter-throughput times (comma, space or newline separated):",
                     value=", ".join(map(str, DEFAULT_DATA[:10])),
                     rows=4
                 )
             ),
             
+            ui.panel_conditional(
+                "input.data_source === 'upload'",
+                ui.input_file(
+                    "data_file",
+                    "CSV (first column), Parquet or raw float64 file:",
+                    accept=[".csv", ".txt", ".parquet", ".pq", ".bin", ".f64", ".dat"]
+                )
+            ),
+            
             ui.input_slider(
                 "boats_needed",
                 "Number of boats needed:",
@@ -151,6 +395,79 @@ app_ui = ui.page_fluid(
                 step=1
             ),
             
+            ui.input_select(
+                "engine",
+                "Model:",
+                choices={
+                    "normal": "Normal approximation",
+                    "simulation": "Monte Carlo (AR(1) bootstrap)"
+                }
+            ),
+            
+            ui.panel_conditional(
+                "input.engine === 'normal'",
+                ui.input_select(
+                    "variance_mode",
+                    "Autocorrelation in the variance:",
+                    choices={
+                        "lag1": "Lag-1 only: (1+ρ₁)/(1-ρ₁)",
+                        "bartlett": "All lags, Bartlett window",
+                        "parzen": "All lags, Parzen window",
+                        "truncated": "All lags, truncated"
+                    }
+                )
+            ),
+            
+            ui.panel_conditional(
+                "input.engine === 'normal'",
+                ui.input_select(
+                    "history",
+                    "History used for the estimates:",
+                    choices={
+                        "all": "All observations, equal weight",
+                        "window": "Last N observations",
+                        "ewma": "Exponentially weighted"
+                    }
+                ),
+                ui.panel_conditional(
+                    "input.history === 'window'",
+                    ui.input_numeric("window", "N (observations):", value=20,
+                                     min=3, step=1)
+                ),
+                ui.panel_conditional(
+                    "input.history === 'ewma'",
+                    ui.input_numeric("halflife", "Half-life (observations):",
+                                     value=10, min=1, step=1)
+                )
+            ),
+            
+            ui.panel_conditional(
+                "input.engine === 'normal'",
+                ui.panel_conditional(
+                    # The resampled statistic is the lag-1 due date with
+                    # equal weights
+                    "input.history !== 'ewma' && input.variance_mode === 'lag1'",
+                    ui.input_switch(
+                        "bootstrap",
+                        "Show estimation uncertainty (block bootstrap)",
+                        value=False
+                    )
+                ),
+                ui.input_switch(
+                    "precompute",
+                    "Precompute all slider positions (instant sliders; "
+                    "bypasses edits to calculate_due_date)",
+                    value=False
+                )
+            ),
+            
+            ui.panel_conditional(
+                "input.engine === 'simulation'",
+                ui.input_numeric("n_paths", "Simulated paths:", value=100000,
+                                 min=1000, max=1000000, step=1000),
+                ui.input_numeric("seed", "Random seed:", value=0, min=0, step=1)
+            ),
+            
             ui.hr(),
             
             ui.markdown("""
@@ -196,17 +513,56 @@ app_ui = ui.page_fluid(
             
             ui.nav_panel("📈 Visualizations",
                 ui.h4("Distribution of Inter-Throughput Times"),
-                ui.output_plot("histogram"),
+                ui.output_ui("histogram"),
                 
                 ui.hr(),
                 
                 ui.h4("Confidence Interval Visualization"),
-                ui.output_plot("confidence_plot"),
+                ui.output_ui("confidence_plot"),
                 
                 ui.hr(),
                 
                 ui.h4("Time Series"),
-                ui.output_plot("timeseries")
+                ui.output_ui("timeseries"),
+                
+                ui.hr(),
+                
+                ui.h4("Due Date Over Time"),
+                ui.output_ui("rolling_plot"),
+                
+                ui.hr(),
+                
+                ui.h4("Every Slider Position at Once"),
+                ui.input_radio_buttons(
+                    "surface_field",
+                    None,
+                    choices={"due_date_days": "Due date", "safety_time_days": "Safety time"},
+                    inline=True
+                ),
+                ui.output_ui("surface_heatmap")
+            ),
+            
+            ui.nav_panel("🗓️ Capacity",
+                ui.h4("How many boats can we promise?"),
+                ui.markdown("""
+                The reverse question: given a deadline and the confidence level
+                from the sidebar, what is the largest order we can accept?
+                """),
+                ui.input_numeric("deadline_days", "Deadline (days):",
+                                 value=30, min=1, max=3650, step=1),
+                ui.output_ui("capacity")
+            ),
+            
+            ui.nav_panel("📦 Portfolio",
+                ui.h4("Several orders on the same line"),
+                ui.markdown("""
+                Orders are built one after another, so order k is done when
+                all boats of orders 1..k are. Each due date uses the
+                confidence level and model from the sidebar.
+                """),
+                ui.input_text_area("orders", "Order sizes in build order (boats):",
+                                   value="10, 5, 20", rows=2),
+                ui.output_table("portfolio_table")
             ),
             
             ui.nav_panel("📚 Learn More",
@@ -307,9 +663,9 @@ app_ui = ui.page_fluid(
                 
                 **Change visualization:**
                 ```python
-                # In histogram function, try:
-                plt.hist(data, bins=15, color='steelblue', alpha=0.7)
-                plt.grid(True, alpha=0.3)
+                # In draw_histogram, try:
+                ax.hist(data, bins=15, color='steelblue', alpha=0.7)
+                ax.grid(True, alpha=0.3)
                 ```
                 
                 **Add new statistic:**
@@ -326,32 +682,162 @@ app_ui = ui.page_fluid(
 
 
 def server(input, output, session):
+    # @timed records call counts, time and cache hits per reactive when
+    # LUXBOAT_METRICS=1 (see luxboat/metrics.py); otherwise it does nothing
+    
+    # Slider positions once dragging pauses (see luxboat/coalesce.py): text
+    # outputs follow every tick, plots and the heavier tables only these
+    settled_boats = Settled(input.boats_needed)
+    settled_confidence = Settled(input.confidence)
+    
+    # Plots and simulations run on the worker pool (see luxboat/workers.py),
+    # at most SESSION_JOBS at a time for this session
+    session_jobs = asyncio.Semaphore(SESSION_JOBS)
+    
+    def offloaded(output=None):
+        """Run prepare()'s job on the pool, only while `output` is visible"""
+        return lambda prepare: Offloaded(prepare, limit=session_jobs, output=output)
+    
+    @reactive.poll(lambda: DATASETS.version, DATASETS_POLL_SECONDS)
+    def datasets_version():
+        """Registry version, rechecked every DATASETS_POLL_SECONDS"""
+        return DATASETS.version
+    
+    @reactive.effect
+    @reactive.event(datasets_version, ignore_init=True)
+    def _update_data_sources():
+        # The selector is built at import; offer datasets added since
+        with reactive.isolate():
+            selected = input.data_source()
+        ui.update_select("data_source", choices=data_source_choices(),
+                         selected=selected)
     
     @reactive.calc
-    def get_data():
-        """Get data based on user selection"""
+    @timed
+    def get_shared():
+        """(read-only data, content hash) for the user selection.
+
+        Sessions that load the same content get the same array object, so
+        a dataset is held in memory once however many sessions use it.
+        """
         if input.data_source() == "custom":
             try:
-                data_str = input.custom_data()
-                data = [float(x.strip()) for x in data_str.split(',')]
-                if len(data) < 2:
-                    return DEFAULT_DATA
-                return data
-            except:
-                return DEFAULT_DATA
+                return SHARED_DATA.intern(parse_times(input.custom_data()),
+                                          owned=True)
+            except DataParseError as err:
+                # Shown in place of the outputs instead of silently
+                # switching back to the example data
+                raise SafeException(f"Custom data: {err}")
+        elif input.data_source().startswith("dataset:"):
+            # Registry datasets are already shared and carry their hash
+            dataset = get_dataset()
+            return dataset.values, dataset.key
+        elif input.data_source() == "upload":
+            files = req(input.data_file())
+            try:
+                # Binary files are memory-mapped, CSV/Parquet read in chunks
+                data = load_file(files[0]["datapath"],
+                                 fmt=detect_format(files[0]["name"]))
+            except (ImportError, ValueError) as err:
+                raise SafeException(f"Uploaded file: {err}")
+            if len(data) < 3:
+                raise SafeException("Uploaded file: need at least 3 values.")
+            return SHARED_DATA.intern(data, owned=True)
         else:
-            return DEFAULT_DATA
+            return DEFAULT_SHARED
+    
+    @reactive.calc
+    @timed
+    def get_data():
+        """Get data based on user selection"""
+        return get_shared()[0]
     
     @reactive.calc
+    @timed
+    def get_dataset():
+        """Registry dataset chosen in the data source selector"""
+        # Appending replaces the Dataset; pick up the new one
+        datasets_version()
+        name = input.data_source().removeprefix("dataset:")
+        dataset = DATASETS.get(name)
+        if dataset is None:
+            raise SafeException(f"Dataset {name!r} is no longer available.")
+        return dataset
+    
+    @reactive.calc
+    @timed
+    def get_data_key():
+        """Content hash of the current data (shared cache key)"""
+        return get_shared()[1]
+    
+    @reactive.calc
+    @timed
+    def get_history():
+        """(data used for the estimates, its cache key) for the chosen history"""
+        data, key = get_data(), get_data_key()
+        if input.history() == "window":
+            window = max(3, int(input.window() or 20))
+            return np.asarray(data, dtype=float)[-window:], (key, "window", window)
+        if input.history() == "ewma":
+            halflife = float(input.halflife() or 10)
+            if input.variance_mode() != "lag1":
+                raise SafeException("Exponential weights only support the lag-1 variance.")
+            return EWMAccumulator(halflife, data), (key, "ewma", halflife)
+        if input.data_source().startswith("dataset:") and input.variance_mode() == "lag1":
+            # Registry datasets carry their statistics: O(1) to switch
+            return get_dataset().acc, key
+        return data, key
+    
+    @reactive.calc
+    @timed
+    def get_surface():
+        """All 50 x 50 slider positions, shared by sessions on the same data"""
+        data, key = get_history()
+        return shared_surface(data, data_key=key,
+                              variance_mode=input.variance_mode())
+    
+    def results_job(boats, confidence):
+        """Function calculating all results (shared via RESULTS_CACHE)"""
+        data, data_key = get_data(), get_data_key()
+        conf = confidence / 100.0
+        if input.engine() == "normal":
+            data, data_key = get_history()
+        if input.engine() == "normal" and input.precompute():
+            # Slider move = array lookup in the precomputed surface
+            surface = get_surface()
+            if surface.contains(boats, confidence):
+                result = surface.lookup(boats, confidence)
+                return lambda: result
+        calculate = calculate_due_date
+        if input.variance_mode() != "lag1":
+            # The ACF is shared per data key, so a new slider position
+            # does not redo its FFT
+            calculate = functools.partial(calculate_due_date,
+                                          variance_mode=input.variance_mode(),
+                                          data_key=data_key)
+        if input.engine() == "simulation":
+            calculate = MonteCarloEngine(n_paths=int(input.n_paths() or 100000),
+                                         seed=int(input.seed() or 0))
+        return functools.partial(cached_due_date, calculate, data, boats, conf,
+                                 cache=RESULTS_CACHE, data_key=data_key)
+    
+    @reactive.calc
+    @timed
     def get_results():
-        """Calculate all results"""
-        data = get_data()
-        boats = input.boats_needed()
-        conf = input.confidence() / 100.0
-        return calculate_due_date(data, boats, conf)
+        """Results at the live slider position (text outputs)"""
+        if input.engine() == "simulation":
+            # Not cheap enough to follow every tick
+            return settled_results.result()
+        return results_job(input.boats_needed(), input.confidence())()
+    
+    @offloaded()
+    def settled_results():
+        """Results at the settled slider position (plots, simulations)"""
+        return results_job(settled_boats(), settled_confidence())
     
     @output
     @render.text
+    @timed
     def due_date_box():
         results = get_results()
         conf = input.confidence()
@@ -359,12 +845,14 @@ def server(input, output, session):
     
     @output
     @render.text
+    @timed
     def avg_time_box():
         results = get_results()
         return f"{results['average_days']:.1f} days\n(50% confidence)"
     
     @output
     @render.text
+    @timed
     def safety_time_box():
         results = get_results()
         pct = (results['safety_time_days'] / results['average_days'] * 100)
@@ -372,11 +860,14 @@ def server(input, output, session):
     
     @output
     @render.table
+    @timed
     def stats_table():
         results = get_results()
         boats = input.boats_needed()
         conf = input.confidence()
         
+        import pandas as pd
+        
         df = pd.DataFrame({
             'Parameter': [
                 'Boats needed',
@@ -401,8 +892,53 @@ def server(input, output, session):
         })
         return df
     
+    @output
+    @render.table
+    @timed
+    def portfolio_table():
+        data, _ = get_history()
+        try:
+            orders = parse_times(input.orders(), min_count=1)
+            portfolio = portfolio_due_dates(data, orders, settled_confidence() / 100.0,
+                                            variance_mode=input.variance_mode())
+        except (DataParseError, ValueError) as err:
+            raise SafeException(f"Orders: {err}")
+        
+        import pandas as pd
+        
+        return pd.DataFrame({
+            'Order': portfolio['order'],
+            'Boats': portfolio['order_boats'].astype(int),
+            'Boats so far': portfolio['boats_needed'].astype(int),
+            'Average (days)': portfolio['average_days'].round(1),
+            'Due date (days)': portfolio['due_date_days'].round(1),
+            'Safety time (days)': portfolio['safety_time_days'].round(1)
+        })
+    
     @output
     @render.ui
+    @timed
+    def capacity():
+        # Same history and variance as the due date it inverts
+        data, _ = get_history()
+        conf = settled_confidence()
+        deadline = req(input.deadline_days())
+        try:
+            boats = max_boats_by_deadline(data, deadline, conf / 100.0,
+                                          variance_mode=input.variance_mode())
+        except ValueError as err:
+            raise SafeException(f"Capacity: {err}")
+        return ui.div(
+            ui.markdown(f"""
+            With **{conf}% confidence**, at most **{boats} boats** can be
+            completed within **{deadline} days**.
+            """),
+            class_="alert alert-info"
+        )
+    
+    @output
+    @render.ui
+    @timed
     def interpretation():
         results = get_results()
         boats = input.boats_needed()
@@ -431,79 +967,142 @@ def server(input, output, session):
             class_="alert alert-info"
         )
     
+    def plot_img(png):
+        """Show cached PNG bytes as a responsive image"""
+        return ui.img(src=png_data_uri(png), style="width: 100%; height: auto;")
+    
+    def plot_output(key, draw, figsize, chart):
+        """Cached PNG, or a chart spec drawn by the browser (LUXBOAT_PLOT_BACKEND=svg)"""
+        if PLOT_BACKEND == "svg":
+            return ui.div(class_="luxchart", data_spec=cached_chart(key, chart))
+        return plot_img(cached_png(key, draw, figsize=figsize))
+    
     @output
-    @render.plot
+    @render.ui
+    @timed
     def histogram():
+        return histogram_job.result()
+    
+    @offloaded("histogram")
+    def histogram_job():
+        # Only depends on the data, so slider moves are cache hits
         data = get_data()
-        results = get_results()
+        return functools.partial(plot_output, ('histogram', get_data_key()),
+                                 lambda ax: draw_histogram(ax, data), (10, 6),
+                                 lambda: histogram_chart(data))
+    
+    @reactive.calc
+    @timed
+    def get_bands_job():
+        """Function giving the 90% moving-block bootstrap ranges of the
+        average and the due date (None when off)"""
+        if (input.engine() != "normal" or not input.bootstrap()
+                or input.history() == "ewma" or input.variance_mode() != "lag1"):
+            # The bootstrap resamples equally weighted observations and
+            # recomputes the lag-1 due date; other estimators get no bands
+            return None
+        data, key = get_history()
+        if hasattr(data, 'summary'):
+            # Registry datasets with all history: the same estimator on
+            # the stored series
+            data, key = get_data(), get_data_key()
+        # Bounded work per plot; series too long for 500 resamples get none
+        n_resamples = min(DEFAULT_RESAMPLES, BOOTSTRAP_MAX_ELEMENTS // len(data))
+        if n_resamples < 500:
+            return None
+        boats = settled_boats()
+        conf = settled_confidence() / 100.0
         
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.hist(data, bins=12, edgecolor='black', alpha=0.7, color='steelblue')
-        ax.axvline(results['mean'], color='red', linestyle='--', linewidth=2,
-                   label=f"Mean: {results['mean']:.1f} hrs")
-        ax.set_xlabel('Inter-Throughput Time (hours)', fontsize=11)
-        ax.set_ylabel('Frequency', fontsize=11)
-        ax.set_title('Distribution of Inter-Throughput Times', fontsize=13, fontweight='bold')
-        ax.legend(fontsize=10)
-        ax.grid(True, alpha=0.3)
+        def compute():
+            samples = bootstrap_due_dates(data, boats, conf,
+                                          n_resamples=n_resamples, seed=0)
+            return {field: interval(samples[field], 0.9)
+                    for field in ('mu_b', 'due_date_hours')}
         
-        return fig
+        return functools.partial(RESULTS_CACHE.get_or_compute,
+                                 ('bootstrap', key, "lag1", boats, conf), compute)
     
     @output
-    @render.plot
+    @render.ui
+    @timed
     def confidence_plot():
-        results = get_results()
-        conf = input.confidence() / 100.0
-        
-        # Create x-axis range
-        mu = results['mu_b']
-        sigma = results['sigma_b']
-        x = np.linspace(mu - 4*sigma, mu + 4*sigma, 1000)
-        y = stats.norm.pdf(x, mu, sigma)
-        
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
-        # Plot distribution
-        ax.plot(x, y, 'b-', linewidth=2, label='Distribution')
-        
-        # Shade confidence area
-        x_fill = x[x <= results['due_date_hours']]
-        y_fill = stats.norm.pdf(x_fill, mu, sigma)
-        ax.fill_between(x_fill, y_fill, alpha=0.3, color='green',
-                        label=f'{conf*100:.0f}% confidence area')
-        
-        # Add vertical lines
-        ax.axvline(mu, color='orange', linestyle='--', linewidth=2,
-                  label=f"Average: {mu:.0f} hrs")
-        ax.axvline(results['due_date_hours'], color='red', linestyle='--', linewidth=2,
-                  label=f"Due date: {results['due_date_hours']:.0f} hrs")
+        return confidence_plot_job.result()
+    
+    @offloaded("confidence_plot")
+    def confidence_plot_job():
+        results = settled_results.result()
+        conf = settled_confidence() / 100.0
+        bands_job = get_bands_job()
         
-        ax.set_xlabel('Time to Complete (hours)', fontsize=11)
-        ax.set_ylabel('Probability Density', fontsize=11)
-        ax.set_title(f'Due Date with {conf*100:.0f}% Confidence', fontsize=13, fontweight='bold')
-        ax.legend(fontsize=10)
-        ax.grid(True, alpha=0.3)
+        def render():
+            bands = bands_job() if bands_job else None
+            key = ('confidence_plot', results['mu_b'], results['sigma_b'],
+                   results['due_date_hours'], conf,
+                   tuple(bands.values()) if bands else None)
+            return plot_output(key, lambda ax: draw_confidence(ax, results, conf, bands),
+                               (12, 6), lambda: confidence_chart(results, conf, bands))
+        return render
+    
+    @output
+    @render.ui
+    @timed
+    def rolling_plot():
+        return rolling_plot_job.result()
+    
+    @offloaded("rolling_plot")
+    def rolling_plot_job():
+        data = get_data()
+        boats = settled_boats()
+        conf = settled_confidence() / 100.0
+        window = halflife = None
+        label = "all history"
+        if input.history() == "window":
+            window = max(3, int(input.window() or 20))
+            label = f"last {window} observations"
+        elif input.history() == "ewma":
+            halflife = float(input.halflife() or 10)
+            label = f"half-life {halflife:g} observations"
+        key = ('rolling_plot', get_data_key(), window, halflife, boats, conf)
+        rolling = lambda: rolling_due_dates(data, boats, conf, window=window,
+                                            halflife=halflife)
+        return functools.partial(plot_output, key,
+                                 lambda ax: draw_rolling(ax, rolling(), label),
+                                 (12, 5), lambda: rolling_chart(rolling(), label))
+    
+    @output
+    @render.ui
+    @timed
+    def surface_heatmap():
+        return surface_heatmap_job.result()
+    
+    @offloaded("surface_heatmap")
+    def surface_heatmap_job():
+        data, key = get_history()
+        variance_mode = input.variance_mode()
+        field = input.surface_field()
         
-        return fig
+        def render():
+            # Computing the surface is the slow part for long series
+            surface = shared_surface(data, data_key=key, variance_mode=variance_mode)
+            png = cached_png(('surface_heatmap', key, variance_mode, field),
+                             lambda ax: draw_surface(ax, surface, field),
+                             figsize=(12, 6))
+            return plot_img(png)
+        return render
     
     @output
-    @render.plot
+    @render.ui
+    @timed
     def timeseries():
+        return timeseries_job.result()
+    
+    @offloaded("timeseries")
+    def timeseries_job():
+        # Only depends on the data, so slider moves are cache hits
         data = get_data()
-        results = get_results()
-        
-        fig, ax = plt.subplots(figsize=(12, 5))
-        ax.plot(range(1, len(data)+1), data, marker='o', linestyle='-',
-                color='steelblue', linewidth=1.5, markersize=6)
-        ax.axhline(results['mean'], color='red', linestyle='--', linewidth=2,
-                  label=f"Mean: {results['mean']:.1f} hrs")
-        ax.set_xlabel('Observation Number', fontsize=11)
-        ax.set_ylabel('Inter-Throughput Time (hours)', fontsize=11)
-        ax.set_title('Time Series of Inter-Throughput Times', fontsize=13, fontweight='bold')
-        ax.legend(fontsize=10)
-        ax.grid(True, alpha=0.3)
-        
-        return fig
+        return functools.partial(plot_output, ('timeseries', get_data_key()),
+                                 lambda ax: draw_timeseries(ax, data), (12, 5),
+                                 lambda: timeseries_chart(data))
 
 
 # Create the app
@@ -12,8 +12,9 @@ This version has:
 
 from shiny import App, render, ui
 import numpy as np
-from scipy import stats
-import matplotlib.pyplot as plt
+
+# scipy and matplotlib are loaded inside the functions that use them,
+# which makes the app start faster
 
 # ============================================================================
 # DATA SECTION - This is our boat completion data from the case study
@@ -110,6 +111,7 @@ def calculate_due_date(data, num_boats, confidence_pct):
     # STEP 5: Get z-score for our confidence level
     # 90% confidence → z ≈ 1.28
     # 95% confidence → z ≈ 1.96
+    from scipy import stats
     z_score = stats.norm.ppf(confidence)
     
     # STEP 6: Calculate due date in hours
@@ -301,6 +303,7 @@ def server(input, output, session):
         results = calculate_due_date(boat_data, input.num_boats(), input.confidence())
         
         # Create the plot
+        import matplotlib.pyplot as plt
         fig, ax = plt.subplots(figsize=(10, 5))
         
         # Draw histogram
@@ -0,0 +1,119 @@
+"""
+Normal Distribution Accuracy Check
+==================================
+Compares luxboat.normal (the dependency-free ppf/pdf/cdf used on the due
+date hot path) against scipy.stats.norm:
+
+- ppf on both tails down to p = 1e-300 and on a dense grid of (0, 1),
+- cdf and pdf from -37 to 37 standard deviations (values down to about 1e-300,
+  above the subnormal range where scipy's cdf flushes to 0) and with
+  loc/scale,
+- the scalar and the array code paths separately,
+- every Z_TABLE entry and z_for_confidence() for the slider values.
+
+Fails (exit status 1) when any relative error exceeds --tolerance
+(default 1e-9). Needs scipy, which the app itself does not.
+
+Usage:
+    python benchmarks/check_normal.py [--tolerance 1e-9] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+from scipy.stats import norm
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from luxboat import normal  # noqa: E402
+
+
+TINY = np.finfo(float).tiny
+
+
+def relative_error(ours, reference):
+    """
+    Largest |ours - reference| / |reference| (equal values count as 0).
+
+    References below the smallest normal float are compared with that
+    float instead, since subnormals carry fewer significant digits.
+    """
+    ours = np.asarray(ours, dtype=float)
+    reference = np.asarray(reference, dtype=float)
+    same = (ours == reference) | (np.isnan(ours) & np.isnan(reference))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        error = np.abs(ours - reference) / np.maximum(np.abs(reference), TINY)
+    error = np.where(same, 0.0, error)
+    # A mismatch against an infinity gives inf or nan: both fail
+    error = np.where(np.isnan(error), np.inf, error)
+    return float(error.max())
+
+
+def probabilities():
+    """Probabilities covering both tails and the centre."""
+    tail = np.logspace(-300, np.log10(0.5), 3001)
+    centre = np.linspace(1e-6, 1 - 1e-6, 100_001)
+    return np.concatenate([[0.0, 0.5, 1.0], tail, 1 - tail, centre])
+
+
+def run_checks():
+    p = probabilities()
+    x = np.linspace(-37, 37, 74_001)
+    scalar_p = p[::97]
+    scalar_x = x[::97]
+    loc, scale = 38.9, 6.1
+
+    checks = {
+        'ppf (array)': relative_error(normal.ppf(p), norm.ppf(p)),
+        'ppf (scalar)': relative_error([normal.ppf(float(v)) for v in scalar_p],
+                                       norm.ppf(scalar_p)),
+        'ppf (loc, scale)': relative_error(normal.ppf(p, loc, scale),
+                                           norm.ppf(p, loc, scale)),
+        'cdf (array)': relative_error(normal.cdf(x), norm.cdf(x)),
+        'cdf (scalar)': relative_error([normal.cdf(float(v)) for v in scalar_x],
+                                       norm.cdf(scalar_x)),
+        'cdf (loc, scale)': relative_error(normal.cdf(loc + scale * x, loc, scale),
+                                           norm.cdf(loc + scale * x, loc, scale)),
+        'pdf': relative_error(normal.pdf(x), norm.pdf(x)),
+        'pdf (loc, scale)': relative_error(normal.pdf(loc + scale * x, loc, scale),
+                                           norm.pdf(loc + scale * x, loc, scale)),
+    }
+
+    pcts = sorted(normal.Z_TABLE)
+    checks['Z_TABLE'] = relative_error([normal.Z_TABLE[pct] for pct in pcts],
+                                       norm.ppf(np.array(pcts) / 100))
+    checks['z_for_confidence'] = relative_error(
+        [normal.z_for_confidence(pct / 100) for pct in pcts],
+        norm.ppf(np.array(pcts) / 100))
+    return checks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tolerance', type=float, default=1e-9)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    checks = run_checks()
+    failures = [name for name, error in checks.items()
+                if not error <= args.tolerance]
+
+    if args.json:
+        print(json.dumps({'tolerance': args.tolerance, 'max_relative_error': checks,
+                          'failures': failures}, indent=2))
+    else:
+        width = max(map(len, checks))
+        for name, error in checks.items():
+            status = 'FAIL' if name in failures else 'ok'
+            print(f"{name:<{width}}  max relative error {error:.2e}  {status}")
+        for name in failures:
+            print(f"FAIL: {name} differs from scipy.stats.norm by more than "
+                  f"{args.tolerance:g}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Import-Time Benchmark
+=====================
+Measures cold-start wall-clock time in fresh interpreters:
+
+- core:  the calculation engines only (luxboat), no UI stack
+- app:   app.py with Shiny, but plotting/table libraries still deferred
+- first: app.py plus the libraries loaded on first render
+         (pandas, matplotlib)
+
+Usage:
+    python benchmarks/import_time.py [--repeat N] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    'baseline': "pass",
+    'core': "import luxboat",
+    'app': "import app",
+    'first': ("import app, pandas, matplotlib.figure, "
+              "matplotlib.backends.backend_agg"),
+}
+
+
+def time_import(statement):
+    """Seconds spent running statement in a fresh interpreter."""
+    code = ("import time; t = time.perf_counter(); "
+            f"{statement}; print(time.perf_counter() - t)")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                         capture_output=True, text=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def heavy_modules_after(statement):
+    """Which of the deferred libraries are loaded after statement."""
+    code = (f"{statement}; import sys; "
+            "print(','.join(m for m in ('scipy', 'pandas', 'matplotlib') "
+            "if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                         capture_output=True, text=True)
+    return [m for m in out.stdout.strip().split(',') if m]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true',
+                        help="print machine-readable results")
+    args = parser.parse_args()
+
+    results = {}
+    for name, statement in SCENARIOS.items():
+        runs = [time_import(statement) for _ in range(args.repeat)]
+        results[name] = {
+            'median_ms': statistics.median(runs) * 1000,
+            'min_ms': min(runs) * 1000,
+            'loaded': heavy_modules_after(statement),
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'scenario':<10}{'median ms':>12}{'min ms':>10}  heavy modules loaded")
+    for name, r in results.items():
+        print(f"{name:<10}{r['median_ms']:>12.1f}{r['min_ms']:>10.1f}  "
+              f"{', '.join(r['loaded']) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
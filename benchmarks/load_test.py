@@ -0,0 +1,168 @@
+"""
+API Load Test
+=============
+Starts the headless API (api.py) on a local port, or targets a running
+server, and hammers POST /due-date from many concurrent keep-alive
+connections. Reports p50/p99 latency and requests per second.
+
+Usage:
+    python benchmarks/load_test.py [--requests 20000] [--concurrency 32]
+                                   [--distinct 100] [--batch 0]
+                                   [--url http://127.0.0.1:8000] [--json]
+
+--distinct controls how many different request bodies are sent (fewer
+means more response-cache hits); --batch N sends N-order batch requests.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_bodies(distinct, batch, seed=0):
+    rng = random.Random(seed)
+    bodies = []
+    for _ in range(distinct):
+        if batch:
+            payload = {
+                'boats_needed': [rng.randint(1, 50) for _ in range(batch)],
+                'confidence_level': [rng.randint(50, 99) / 100 for _ in range(batch)],
+            }
+        else:
+            payload = {
+                'boats_needed': rng.randint(1, 50),
+                'confidence_level': rng.randint(50, 99) / 100,
+            }
+        bodies.append(json.dumps(payload).encode())
+    return bodies
+
+
+async def _request(reader, writer, host, path, body):
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+        .encode() + body)
+    await writer.drain()
+
+    status = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode().partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return int(status.split()[1])
+
+
+async def _worker(url, bodies, queue, latencies, errors):
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port)
+    try:
+        while True:
+            try:
+                i = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            status = await _request(reader, writer, parts.netloc,
+                                    '/due-date', bodies[i % len(bodies)])
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run_load(url, bodies, n_requests, concurrency):
+    queue = asyncio.Queue()
+    for i in range(n_requests):
+        queue.put_nowait(i)
+    latencies, errors = [], []
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_worker(url, bodies, queue, latencies, errors)
+                           for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'seconds': elapsed,
+        'rps': len(latencies) / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[int(0.99 * (len(latencies) - 1))] * 1000,
+        'max_ms': latencies[-1] * 1000,
+    }
+
+
+def start_server(port):
+    """Launch uvicorn with the standalone API and wait until it answers."""
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'api:api', '--port', str(port),
+         '--log-level', 'warning'],
+        cwd=ROOT)
+
+    async def ready():
+        for _ in range(200):
+            try:
+                _, writer = await asyncio.open_connection('127.0.0.1', port)
+                writer.close()
+                return
+            except OSError:
+                await asyncio.sleep(0.05)
+        raise RuntimeError("server did not start")
+
+    asyncio.run(ready())
+    return proc
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--distinct', type=int, default=100)
+    parser.add_argument('--batch', type=int, default=0)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--url', help="target a running server instead")
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    proc = None
+    url = args.url
+    if url is None:
+        proc = start_server(args.port)
+        url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        bodies = make_bodies(args.distinct, args.batch)
+        result = asyncio.run(run_load(url, bodies, args.requests, args.concurrency))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{result['requests']} requests ({result['errors']} errors) "
+              f"in {result['seconds']:.2f} s")
+        print(f"  {result['rps']:.0f} req/s   p50 {result['p50_ms']:.2f} ms   "
+              f"p99 {result['p99_ms']:.2f} ms   max {result['max_ms']:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+"""
+Per-Session Memory Check
+========================
+Starts the app and the API together (uvicorn api:combined) on a local port,
+opens N browser-like websocket sessions that stay connected, and measures
+how much the server's resident memory grows per session.
+
+Sessions cycle through --distinct different pasted datasets, so most of
+them load content another session already holds; luxboat.shared must keep
+one copy of each. The datasets hold --values single-digit values. The
+server keeps each session's pasted text (2 bytes per value) about three
+times (websocket frame, decoded message, input value), but one float64
+copy of the data per session (8 bytes per value) on top of that would
+exceed the bound.
+
+One session per dataset is opened first and kept open, so fixed costs
+(shared arrays, caches, the figures) are paid before the baseline; later
+sessions repeat the inputs of one of them, so their plots come from the
+cache and draw no new figures whose garbage would blur the measurement.
+The growth per session is then the interquartile mean of the RSS increase
+at each of the N further sessions: steady growth shows in every step, while
+a one-off drop (a full garbage collection freeing figure cycles of the
+warm-up) lands in the discarded quarters. Fails (exit status 1) when
+
+- the slope exceeds --max-kib-per-session (default: three times the
+  pasted text plus 1024 KiB),
+- the shared store holds more arrays than distinct datasets in use, or
+- more than --max-live-figures Matplotlib figures are still alive.
+
+Linux only (reads /proc/<pid>/status).
+
+Usage:
+    python benchmarks/memory_sessions.py [--sessions 40] [--distinct 5]
+                                         [--values 400000]
+                                         [--max-kib-per-session KIB]
+                                         [--max-live-figures 20] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+import websockets
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+OUTPUTS = [
+    'due_date_box', 'avg_time_box', 'safety_time_box', 'stats_table',
+    'interpretation', 'histogram', 'confidence_plot', 'timeseries',
+    'rolling_plot', 'surface_heatmap', 'capacity', 'portfolio_table',
+]
+
+
+# Copies of the pasted text the server holds per session (websocket frame,
+# decoded message, input value)
+TEXT_COPIES = 3
+
+# Allowance per session on top of that (reactives, rendered outputs)
+SESSION_OVERHEAD_KIB = 1024
+
+
+def custom_data(i, distinct, size):
+    """Pasted text of dataset i % distinct: size digits 1-9, space separated."""
+    offset = 13 * (i % distinct)
+    return ' '.join(str(1 + (7 * j + offset) % 9) for j in range(size))
+
+
+def session_inputs(i, distinct, size=200):
+    """Init message inputs of session i (the same as session i % distinct)."""
+    inputs = {
+        'data_source': 'custom',
+        'custom_data': custom_data(i, distinct, size),
+        'data_file': None,
+        'boats_needed': 10 + i % distinct,
+        'confidence': 90,
+        'engine': 'normal',
+        'variance_mode': 'lag1',
+        'history': 'all',
+        'window': 20,
+        'halflife': 10,
+        'bootstrap': False,
+        'precompute': False,
+        'n_paths': 100000,
+        'seed': 0,
+        'surface_field': 'due_date_days',
+        'deadline_days': 30,
+        'orders': '10, 5, 20',
+    }
+    for name in OUTPUTS:
+        inputs[f'.clientdata_output_{name}_hidden'] = False
+    return inputs
+
+
+async def open_session(url, inputs, timeout=30):
+    """Connect, send init and wait until every output has a value."""
+    ws = await websockets.connect(url, max_size=None)
+    await ws.send(json.dumps({'method': 'init', 'data': inputs}))
+    received = set()
+    deadline = time.monotonic() + timeout
+    while not received.issuperset(OUTPUTS):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            missing = sorted(set(OUTPUTS) - received)
+            raise RuntimeError(f"session timed out waiting for {missing}")
+        message = json.loads(await asyncio.wait_for(ws.recv(), remaining))
+        received.update(message.get('values') or {})
+        received.update(message.get('errors') or {})
+    return ws
+
+
+def rss_kib(pid):
+    with open(f'/proc/{pid}/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    raise RuntimeError("VmRSS not found")
+
+
+def server_stats(port):
+    with urllib.request.urlopen(f'http://127.0.0.1:{port}/api/stats') as reply:
+        return json.load(reply)
+
+
+def start_server(port):
+    """Launch uvicorn with the app and API and wait until it answers."""
+    # Large blocks straight from mmap, so freeing them lowers RSS at once
+    # and the slope follows live memory rather than allocator reuse
+    env = dict(os.environ, MALLOC_MMAP_THRESHOLD_='65536')
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'api:combined', '--port', str(port),
+         '--log-level', 'warning'],
+        cwd=ROOT, env=env)
+    for _ in range(400):
+        try:
+            server_stats(port)
+            return proc
+        except OSError:
+            time.sleep(0.05)
+    proc.terminate()
+    raise RuntimeError("server did not start")
+
+
+async def run_check(port, pid, n_sessions, distinct, size):
+    url = f'ws://127.0.0.1:{port}/websocket/'
+
+    # One session per dataset stays open throughout, so the shared arrays,
+    # caches and first figures exist before the measured sessions start
+    warm = [await open_session(url, session_inputs(i, distinct, size))
+            for i in range(distinct)]
+    await asyncio.sleep(0.5)
+    baseline = rss_kib(pid)
+
+    sessions = []
+    rss = []
+    start = time.perf_counter()
+    for i in range(n_sessions):
+        sessions.append(await open_session(url, session_inputs(i, distinct, size)))
+        await asyncio.sleep(0.1)
+        rss.append(rss_kib(pid))
+    elapsed = time.perf_counter() - start
+    stats = server_stats(port)
+
+    for ws in warm + sessions:
+        await ws.close()
+    await asyncio.sleep(1.0)
+
+    steps = sorted(b - a for a, b in zip([baseline] + rss, rss))
+    quarter = len(steps) // 4
+    return {
+        'sessions': n_sessions,
+        'distinct_datasets': distinct,
+        'values_per_dataset': size,
+        'seconds_to_open': elapsed,
+        'rss_baseline_kib': baseline,
+        'rss_loaded_kib': rss[-1],
+        'rss_closed_kib': rss_kib(pid),
+        'steps': steps,
+        'kib_per_session': statistics.mean(steps[quarter:len(steps) - quarter]),
+        'shared_arrays': stats['shared_data']['size'],
+        'shared_hits': stats['shared_data']['hits'],
+        'shared_bytes': stats['shared_data']['nbytes'],
+        'figures_created': stats['figures']['created'],
+        'figures_live': stats['figures']['live'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sessions', type=int, default=40)
+    parser.add_argument('--distinct', type=int, default=5)
+    parser.add_argument('--values', type=int, default=400_000)
+    parser.add_argument('--max-kib-per-session', type=float, default=None)
+    parser.add_argument('--max-live-figures', type=int, default=20)
+    parser.add_argument('--port', type=int, default=8767)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    if args.sessions < 4:
+        parser.error("--sessions must be at least 4 (quartiles of the steps)")
+    text_kib = len(custom_data(0, args.distinct, args.values)) / 1024
+    copy_kib = args.values * 8 / 1024
+    if args.max_kib_per_session is None:
+        args.max_kib_per_session = TEXT_COPIES * text_kib + SESSION_OVERHEAD_KIB
+    if copy_kib <= args.max_kib_per_session - TEXT_COPIES * text_kib:
+        parser.error(f"--values {args.values} is too small: a {copy_kib:.0f} KiB "
+                     f"copy per session would not exceed the bound")
+
+    proc = start_server(args.port)
+    try:
+        result = asyncio.run(run_check(args.port, proc.pid, args.sessions,
+                                       args.distinct, args.values))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    failures = []
+    if result['kib_per_session'] > args.max_kib_per_session:
+        failures.append(f"{result['kib_per_session']:.0f} KiB per session "
+                        f"(limit {args.max_kib_per_session:.0f})")
+    # The example data is always held, plus one array per pasted dataset
+    if result['shared_arrays'] > args.distinct + 1:
+        failures.append(f"{result['shared_arrays']} shared arrays for "
+                        f"{args.distinct} distinct datasets")
+    if result['figures_live'] > args.max_live_figures:
+        failures.append(f"{result['figures_live']} live figures "
+                        f"(limit {args.max_live_figures})")
+    result['failures'] = failures
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{result['sessions']} sessions on {result['distinct_datasets']} "
+              f"datasets of {result['values_per_dataset']} values opened in "
+              f"{result['seconds_to_open']:.1f} s")
+        print(f"  RSS {result['rss_baseline_kib'] / 1024:.1f} MiB -> "
+              f"{result['rss_loaded_kib'] / 1024:.1f} MiB "
+              f"({result['kib_per_session']:.0f} KiB/session, "
+              f"limit {args.max_kib_per_session:.0f}), "
+              f"{result['rss_closed_kib'] / 1024:.1f} MiB after closing")
+        print(f"  shared arrays {result['shared_arrays']} "
+              f"({result['shared_hits']} reuses, {result['shared_bytes']} bytes)   "
+              f"figures {result['figures_created']} created, "
+              f"{result['figures_live']} live")
+        for failure in failures:
+            print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
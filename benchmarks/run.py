@@ -0,0 +1,144 @@
+"""
+Benchmark Runner
+================
+Dependency-free runner for the asv-style suite in suite/benchmarks.py.
+
+Times every time_* method (best of several repeats, each repeat auto-sized
+to at least 0.2 s), records every track_* value, and writes the results as
+JSON so runs can be compared over time.
+
+Usage:
+    python benchmarks/run.py [--quick] [--filter REGEX]
+                             [--output FILE] [--compare OLD.json]
+
+--quick skips numeric parameters above 10^6 (e.g. the 10^7-point dataset).
+Results go to .benchmarks/<timestamp>.json by default.
+"""
+
+import argparse
+import datetime
+import inspect
+import itertools
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'suite'))
+
+import benchmarks  # noqa: E402
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+QUICK_LIMIT = 1_000_000
+
+
+def iter_cases(quick=False):
+    """Yield (name, class, method name, params) for every benchmark."""
+    for cls_name, cls in inspect.getmembers(benchmarks, inspect.isclass):
+        if cls.__module__ != benchmarks.__name__:
+            continue
+        param_lists = getattr(cls, 'params', [])
+        if quick:
+            param_lists = [[v for v in p if not (isinstance(v, int) and v > QUICK_LIMIT)]
+                           for p in param_lists]
+        combos = list(itertools.product(*param_lists)) or [()]
+        methods = [m for m in dir(cls) if m.startswith(('time_', 'track_'))]
+        for params in combos:
+            for method in methods:
+                label = f"{cls_name}.{method}"
+                if params:
+                    label += "(" + ", ".join(map(str, params)) + ")"
+                yield label, cls, method, params
+
+
+def run_case(cls, method, params, repeat):
+    bench = cls()
+    if hasattr(bench, 'setup'):
+        bench.setup(*params)
+    func = getattr(bench, method)
+
+    if method.startswith('track_'):
+        return {'value': func(*params), 'unit': getattr(func, 'unit', '')}
+
+    timer = timeit.Timer(lambda: func(*params))
+    number, _ = timer.autorange()
+    runs = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {'value': min(runs), 'unit': 'seconds', 'runs': runs, 'number': number}
+
+
+def metadata():
+    import numpy
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': numpy.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def format_value(result):
+    value, unit = result['value'], result['unit']
+    if unit == 'seconds':
+        for scale, suffix in ((1, 's'), (1e-3, 'ms'), (1e-6, 'us')):
+            if value >= scale:
+                return f"{value / scale:.3g} {suffix}"
+        return f"{value * 1e9:.3g} ns"
+    if unit == 'bytes':
+        return f"{value / 1024:.1f} KiB"
+    return f"{value} {unit}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--quick', action='store_true')
+    parser.add_argument('--filter', default='')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output')
+    parser.add_argument('--compare', help="previous results file")
+    args = parser.parse_args()
+
+    previous = {}
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)['results']
+
+    results = {}
+    pattern = re.compile(args.filter)
+    for label, cls, method, params in iter_cases(args.quick):
+        if not pattern.search(label):
+            continue
+        result = run_case(cls, method, params, args.repeat)
+        results[label] = result
+
+        line = f"{label:<60} {format_value(result):>12}"
+        old = previous.get(label)
+        if old and old['value']:
+            line += f"   x{result['value'] / old['value']:.2f} vs previous"
+        print(line, flush=True)
+
+    output = args.output
+    if output is None:
+        os.makedirs(os.path.join(ROOT, '.benchmarks'), exist_ok=True)
+        stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+        output = os.path.join(ROOT, '.benchmarks', f"{stamp}.json")
+    with open(output, 'w') as f:
+        json.dump({'meta': metadata(), 'results': results}, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == '__main__':
+    main()
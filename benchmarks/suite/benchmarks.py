@@ -0,0 +1,312 @@
+"""
+Benchmark Suite
+===============
+Hot paths of the calculator: scalar and batch due dates, the statistics
+functions across dataset sizes, parsing pasted data and rendering plots.
+
+Written in asv conventions (classes with setup(), params, time_* and
+track_* methods), so it runs with `asv run` (see asv.conf.json) or with the
+dependency-free runner:
+
+    python benchmarks/run.py [--quick] [--filter REGEX] [--compare OLD.json]
+
+track_peak_* methods report the tracemalloc peak in bytes.
+"""
+
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+import app  # noqa: E402
+from luxboat import (  # noqa: E402
+    RESULTS_CACHE,
+    EWMAccumulator,
+    StatsAccumulator,
+    bootstrap_due_dates,
+    cached_due_date,
+    calculate_due_date_batch,
+    parse_times,
+    portfolio_due_dates,
+    rolling_due_dates,
+    summarize,
+)
+from luxboat.charts import CHART_CACHE  # noqa: E402
+from luxboat.plots import PLOT_CACHE, cached_png, figure_png, png_data_uri  # noqa: E402
+from luxboat.registry import DatasetRegistry  # noqa: E402
+from luxboat.surface import ResultsSurface  # noqa: E402
+
+
+SIZES = [29, 10_000, 1_000_000, 10_000_000]
+
+
+def make_series(n, seed=0):
+    """DEFAULT_DATA for n=29, otherwise an AR(1) series with similar stats."""
+    from scipy.signal import lfilter
+
+    if n == len(app.DEFAULT_DATA):
+        return np.array(app.DEFAULT_DATA)
+    rng = np.random.default_rng(seed)
+    phi, mean, std = 0.38, 38.9, 6.1
+    noise = rng.normal(0, std * np.sqrt(1 - phi * phi), n)
+    values = lfilter([1.0], [1.0, -phi], noise)
+    return values + mean
+
+
+def peak_alloc(func, *args):
+    """Peak traced memory (bytes) while running func(*args)."""
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class ScalarCalculation:
+    """One order on the example data, as the app computes it per slider move."""
+
+    def setup(self):
+        self.data = app.DEFAULT_DATA
+        RESULTS_CACHE.clear()
+
+    def time_calculate_due_date(self):
+        app.calculate_due_date(self.data, 25, 0.9)
+
+    def time_calculate_statistics(self):
+        app.calculate_statistics(self.data)
+
+    def time_calculate_autocorrelation(self):
+        app.calculate_autocorrelation(np.asarray(self.data))
+
+    def time_cached_due_date(self):
+        cached_due_date(app.calculate_due_date, self.data, 25, 0.9)
+
+
+class BatchCalculation:
+    """Many orders priced in one vectorized call."""
+
+    params = [[50, 2500, 100_000]]
+    param_names = ['orders']
+
+    def setup(self, orders):
+        rng = np.random.default_rng(0)
+        self.summary = summarize(app.DEFAULT_DATA)
+        self.boats = rng.integers(1, 51, orders)
+        self.conf = rng.integers(50, 100, orders) / 100
+
+    def time_batch(self, orders):
+        calculate_due_date_batch(self.summary, self.boats, self.conf)
+
+
+class Portfolio:
+    """Orders queued on one line, priced in one cumulative pass."""
+
+    params = [[10, 100, 1000]]
+    param_names = ['orders']
+
+    def setup(self, orders):
+        self.orders = np.random.default_rng(0).integers(1, 51, orders)
+
+    def time_portfolio(self, orders):
+        portfolio_due_dates(app.DEFAULT_DATA, self.orders, 0.9)
+
+    def time_portfolio_bartlett(self, orders):
+        portfolio_due_dates(app.DEFAULT_DATA, self.orders, 0.9, variance_mode='bartlett')
+
+
+class Bootstrap:
+    """Moving-block bootstrap of the due date on the example data."""
+
+    params = [[1_000, 10_000, 100_000]]
+    param_names = ['resamples']
+
+    def time_bootstrap_due_dates(self, resamples):
+        bootstrap_due_dates(app.DEFAULT_DATA, 25, 0.9, n_resamples=resamples, seed=0)
+
+    def track_peak_bootstrap(self, resamples):
+        return peak_alloc(bootstrap_due_dates, app.DEFAULT_DATA, 25, 0.9, resamples, None, 0)
+    track_peak_bootstrap.unit = 'bytes'
+
+
+class ScalarLoop(BatchCalculation):
+    """The same orders priced one calculate_due_date() call at a time."""
+
+    params = [[50, 2500]]
+
+    def time_batch(self, orders):
+        for b, c in zip(self.boats, self.conf):
+            app.calculate_due_date(app.DEFAULT_DATA, b, c)
+
+
+class Surface:
+    """All 2,500 slider positions at once, then one slider move."""
+
+    def setup(self):
+        self.surface = ResultsSurface.from_data(app.DEFAULT_DATA)
+
+    def time_build(self):
+        ResultsSurface.from_data(app.DEFAULT_DATA)
+
+    def time_lookup(self):
+        self.surface.lookup(25, 90)
+
+
+class Registry:
+    """12 lines and 30 hull models: startup load and switching datasets."""
+
+    def setup(self):
+        import tempfile
+
+        registry = DatasetRegistry()
+        for i in range(12):
+            registry.add(f"line-{i + 1:02d}", make_series(20_000, seed=i), "Lines")
+        for i in range(30):
+            registry.add(f"hull-{i + 1:02d}", make_series(5_000, seed=100 + i), "Hulls")
+        self.path = os.path.join(tempfile.mkdtemp(), 'datasets.npz')
+        registry.save(self.path)
+        self.registry = registry
+
+    def time_load(self):
+        DatasetRegistry.load(self.path)
+
+    def time_switch_dataset(self):
+        dataset = self.registry['hull-07']
+        cached_due_date(app.calculate_due_date, dataset.acc, 25, 0.9,
+                        data_key=dataset.key)
+
+    def time_append(self):
+        self.registry.append('line-01', [40.0])
+
+    def track_file_bytes(self):
+        return os.path.getsize(self.path)
+    track_file_bytes.unit = 'bytes'
+
+
+class DatasetSize:
+    """Statistics and due dates from 29 to 10^7 observations."""
+
+    params = [SIZES]
+    param_names = ['n']
+    timeout = 300
+
+    def setup(self, n):
+        self.data = make_series(n)
+
+    def time_calculate_due_date(self, n):
+        app.calculate_due_date(self.data, 25, 0.9)
+
+    def time_calculate_statistics(self, n):
+        app.calculate_statistics(self.data)
+
+    def time_calculate_autocorrelation(self, n):
+        app.calculate_autocorrelation(self.data)
+
+    def time_summarize(self, n):
+        summarize(self.data)
+
+    def time_accumulator_extend(self, n):
+        StatsAccumulator(self.data)
+
+    def time_fused_one_thread(self, n):
+        StatsAccumulator.from_array(self.data, workers=1)
+
+    def time_rolling_window(self, n):
+        rolling_due_dates(self.data, 25, 0.9, window=500)
+
+    def time_rolling_ewma(self, n):
+        rolling_due_dates(self.data, 25, 0.9, halflife=100)
+
+    def time_ewma_extend(self, n):
+        EWMAccumulator(100, self.data)
+
+    def track_peak_calculate_due_date(self, n):
+        return peak_alloc(app.calculate_due_date, self.data, 25, 0.9)
+    track_peak_calculate_due_date.unit = 'bytes'
+
+    def track_peak_accumulator(self, n):
+        return peak_alloc(StatsAccumulator, self.data)
+    track_peak_accumulator.unit = 'bytes'
+
+    def track_peak_summarize(self, n):
+        return peak_alloc(summarize, self.data)
+    track_peak_summarize.unit = 'bytes'
+
+
+class Parsing:
+    """Pasted custom data, as get_data receives it."""
+
+    params = [[29, 10_000, 1_000_000]]
+    param_names = ['n']
+
+    def setup(self, n):
+        values = make_series(n)
+        self.text = ", ".join(f"{v:.2f}" for v in values)
+
+    def time_parse_times(self, n):
+        parse_times(self.text)
+
+    def time_split_float(self, n):
+        # The original get_data approach, for comparison
+        [float(x.strip()) for x in self.text.split(',')]
+
+    def track_peak_parse_times(self, n):
+        return peak_alloc(parse_times, self.text)
+    track_peak_parse_times.unit = 'bytes'
+
+
+class Rendering:
+    """
+    The three plots: cold render time, bytes sent and cache hits.
+
+    *_png is the Matplotlib backend, *_chart the client-side SVG backend
+    (LUXBOAT_PLOT_BACKEND=svg), which only sends the chart spec.
+    """
+
+    params = [['histogram', 'confidence_plot', 'timeseries']]
+    param_names = ['plot']
+
+    def setup(self, plot):
+        data = app.DEFAULT_DATA
+        results = app.calculate_due_date(data, 25, 0.9)
+        self.draw, self.figsize, self.chart = {
+            'histogram': (lambda ax: app.draw_histogram(ax, data), (10, 6),
+                          lambda: app.histogram_chart(data)),
+            'confidence_plot': (lambda ax: app.draw_confidence(ax, results, 0.9), (12, 6),
+                                lambda: app.confidence_chart(results, 0.9)),
+            'timeseries': (lambda ax: app.draw_timeseries(ax, data), (12, 5),
+                           lambda: app.timeseries_chart(data)),
+        }[plot]
+        PLOT_CACHE.clear()
+        CHART_CACHE.clear()
+        cached_png(('bench', plot), self.draw, self.figsize)
+
+    def time_render_png(self, plot):
+        figure_png(self.draw, self.figsize)
+
+    def time_cache_hit(self, plot):
+        cached_png(('bench', plot), self.draw, self.figsize)
+
+    def time_render_chart(self, plot):
+        self.chart().to_json()
+
+    def track_png_bytes(self, plot):
+        return len(figure_png(self.draw, self.figsize))
+    track_png_bytes.unit = 'bytes'
+
+    def track_update_bytes_png(self, plot):
+        # What an output update carries: the PNG as a base64 data URI
+        return len(png_data_uri(figure_png(self.draw, self.figsize)))
+    track_update_bytes_png.unit = 'bytes'
+
+    def track_update_bytes_chart(self, plot):
+        return len(str(app.ui.div(class_="luxchart", data_spec=self.chart().to_json())))
+    track_update_bytes_chart.unit = 'bytes'
+
+    def track_peak_render(self, plot):
+        return peak_alloc(figure_png, self.draw, self.figsize)
+    track_peak_render.unit = 'bytes'
@@ -0,0 +1,62 @@
+"""
+LuxBoat calculation engines
+===========================
+Reusable building blocks behind the Shiny apps:
+
+- summary / accumulator: sufficient statistics, batch or streaming
+- kernels:  fused one-pass moments for very long series (Numba optional)
+- batch:    vectorized due dates for many (boats, confidence) pairs
+- simulate: Monte Carlo AR(1) bootstrap engine
+- parallel: serial/thread/process sharding with reproducible seeds
+- cache:    process-wide results cache shared by all sessions
+- plots:    cached PNG rendering
+- charts:   client-side SVG chart specs (LUXBOAT_PLOT_BACKEND=svg)
+- normal:   dependency-free normal ppf/pdf/cdf
+- acf:      FFT autocorrelation and all-lags variance of a b-boat total
+- bootstrap: moving-block bootstrap distribution of the due date
+- parsing:  bulk parser for pasted data
+- ingest:   chunked / memory-mapped CSV, Parquet and binary files
+- inverse:  max boats deliverable by a deadline
+- metrics:  optional per-call timing, Prometheus exposition
+- surface:  precomputed results for every slider position
+- rolling:  windowed / exponentially weighted estimates, rolling due dates
+- registry: named datasets (lines, products) with stored statistics
+- portfolio: due dates of several orders queued on one line
+- shared:   one read-only copy of each dataset for all sessions
+- coalesce: settled slider values, latest-only background jobs
+            (Shiny only, not re-exported)
+- workers:  bounded thread pool that keeps heavy work off the event loop
+"""
+
+from .summary import Summary, summarize
+from .accumulator import StatsAccumulator
+from .acf import acf, autocovariance, variance_multiplier
+from .bootstrap import bootstrap_due_dates
+from .cache import LRUCache, RESULTS_CACHE, cached_due_date, fingerprint
+from .ingest import accumulate_file, iter_chunks, load_file
+from .inverse import boats_within_hours, max_boats_by_deadline
+from .parsing import DataParseError, parse_times
+from .portfolio import PORTFOLIO_DTYPE, portfolio_due_dates
+from .registry import DATASETS, Dataset, DatasetRegistry
+from .rolling import (
+    EWMAccumulator,
+    WindowedAccumulator,
+    rolling_due_dates,
+    rolling_summary,
+)
+from .shared import SHARED_DATA, SharedArrays
+from .surface import ResultsSurface, shared_surface
+from .workers import WORKER_POOL, WorkerPool
+from .simulate import MonteCarloEngine, simulate_due_date, simulate_totals
+from .batch import (
+    RESULT_DTYPE,
+    calculate_due_date_batch,
+    due_date_from_summary,
+    results_to_frame,
+)
+from .parallel import (
+    bootstrap_statistics,
+    confidence_sweep,
+    map_shards,
+    parallel_simulate_totals,
+)
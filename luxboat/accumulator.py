@@ -0,0 +1,277 @@
+"""
+Streaming Statistics Accumulator
+================================
+Keeps the sufficient statistics of an inter-throughput series up to date as
+new completions arrive, without storing or rescanning the history.
+
+Uses Welford's algorithm for the mean and M2 (sum of squared deviations) of
+the series, and the bivariate form of the same update for the consecutive
+pairs (x[i], x[i+1]) so the lag-1 autocorrelation matches
+np.corrcoef(x[:-1], x[1:]) exactly.
+
+Blocks of data (extend, from_array) are reduced with the fused one-pass
+kernel in luxboat.kernels, shard by shard on several threads for very
+long series, and merged in order.
+"""
+
+import os
+
+import numpy as np
+
+from .kernels import SHARD, chunk_bounds, chunk_moments
+from .summary import Summary
+
+
+class StatsAccumulator:
+    """
+    O(1) append / remove-oldest accumulator with parallel merge support.
+
+    Tracks for the whole series: count, mean, M2.
+    Tracks for the lag-1 pairs: head mean/M2 (x[:-1]), tail mean/M2 (x[1:])
+    and the cross-product of their deviations.
+    """
+
+    def __init__(self, data=None):
+        self.n = 0
+        self._mean = 0.0
+        self.m2 = 0.0
+        self.first = None
+        self.last = None
+
+        # Lag-1 pair statistics: head = x[:-1], tail = x[1:]
+        self.head_mean = 0.0
+        self.tail_mean = 0.0
+        self.head_m2 = 0.0
+        self.tail_m2 = 0.0
+        self.cross = 0.0
+
+        if data is not None:
+            self.extend(data)
+
+    @classmethod
+    def from_moments(cls, n, mean, m2, first, last,
+                     head_mean, tail_mean, head_m2, tail_m2, cross):
+        """Rebuild an accumulator from stored moments (see to_moments)."""
+        acc = cls()
+        acc.n = int(n)
+        acc._mean = float(mean)
+        acc.m2 = float(m2)
+        acc.first = None if acc.n == 0 else float(first)
+        acc.last = None if acc.n == 0 else float(last)
+        acc.head_mean = float(head_mean)
+        acc.tail_mean = float(tail_mean)
+        acc.head_m2 = float(head_m2)
+        acc.tail_m2 = float(tail_m2)
+        acc.cross = float(cross)
+        return acc
+
+    def to_moments(self):
+        """Return the state as a tuple accepted by from_moments()."""
+        return (self.n, self._mean, self.m2, self.first, self.last,
+                self.head_mean, self.tail_mean, self.head_m2, self.tail_m2,
+                self.cross)
+
+    @classmethod
+    def from_array(cls, data, workers=None):
+        """
+        Accumulator over a whole series in one pass over memory.
+
+        Series longer than one shard are reduced on up to `workers` threads
+        (default: CPU count); the result does not depend on the number of
+        threads.
+        """
+        values = np.ascontiguousarray(data, dtype=np.float64).ravel()
+        if values.size == 0:
+            return cls()
+        shards = [(start, min(start + SHARD, values.size))
+                  for start in range(0, values.size, SHARD)]
+        workers = min(workers or os.cpu_count() or 1, len(shards))
+
+        def reduce(shard):
+            start, stop = shard
+            acc = cls()
+            for lo, hi in chunk_bounds(stop - start):
+                block = cls.from_moments(*chunk_moments(values, start + lo, start + hi))
+                acc = acc.merge(block) if acc.n else block
+            return acc
+
+        if workers > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                parts = list(pool.map(reduce, shards))
+        else:
+            parts = [reduce(shard) for shard in shards]
+
+        acc = parts[0]
+        for part in parts[1:]:
+            acc = acc.merge(part)
+        return acc
+
+    def copy(self):
+        return StatsAccumulator.from_moments(*self.to_moments())
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def append(self, x):
+        """Add one new observation in O(1)."""
+        x = float(x)
+
+        if self.n == 0:
+            self.first = x
+        else:
+            # New consecutive pair (last, x)
+            a, b = self.last, x
+            k = self.n  # number of pairs after this one
+            da = a - self.head_mean
+            db = b - self.tail_mean
+            self.head_mean += da / k
+            self.tail_mean += db / k
+            self.head_m2 += da * (a - self.head_mean)
+            self.tail_m2 += db * (b - self.tail_mean)
+            self.cross += da * (b - self.tail_mean)
+
+        self.n += 1
+        delta = x - self._mean
+        self._mean += delta / self.n
+        self.m2 += delta * (x - self._mean)
+        self.last = x
+
+    def extend(self, data):
+        """
+        Add a block of observations.
+
+        The block is reduced in one fused pass (from_array) and merged in,
+        so this is much faster than appending values one at a time.
+        """
+        values = np.asarray(data, dtype=float).ravel()
+        if values.size == 0:
+            return self
+        block = StatsAccumulator.from_array(values)
+        self._assign(self.merge(block) if self.n else block)
+        return self
+
+    def remove_oldest(self, following=None):
+        """
+        Drop the oldest observation in O(1), for sliding windows.
+
+        following is the observation right after the oldest one (the new
+        first value); it is needed to remove the oldest lag-1 pair and may
+        be omitted only when a single observation is left.
+        """
+        if self.n == 0:
+            raise ValueError("accumulator is empty")
+        if self.n == 1:
+            self._assign(StatsAccumulator())
+            return
+        if following is None:
+            raise ValueError("following observation is required")
+
+        x = self.first
+        a, b = x, float(following)
+
+        # Undo the pair (oldest, following)
+        pairs = self.n - 1
+        if pairs == 1:
+            self.head_mean = self.tail_mean = 0.0
+            self.head_m2 = self.tail_m2 = self.cross = 0.0
+        else:
+            head_mean = (pairs * self.head_mean - a) / (pairs - 1)
+            tail_mean = (pairs * self.tail_mean - b) / (pairs - 1)
+            self.head_m2 -= (a - head_mean) * (a - self.head_mean)
+            self.tail_m2 -= (b - tail_mean) * (b - self.tail_mean)
+            self.cross -= (a - head_mean) * (b - self.tail_mean)
+            self.head_mean, self.tail_mean = head_mean, tail_mean
+
+        # Undo the observation itself
+        mean = (self.n * self._mean - x) / (self.n - 1)
+        self.m2 -= (x - mean) * (x - self._mean)
+        self._mean = mean
+        self.n -= 1
+        self.first = b
+
+    def merge(self, other):
+        """
+        Combine with an accumulator over the data that directly follows.
+
+        Uses Chan et al.'s parallel update for both the series and the pair
+        statistics, then adds the pair bridging self.last and other.first.
+        Returns a new accumulator; neither input is modified.
+        """
+        if other.n == 0:
+            return self.copy()
+        if self.n == 0:
+            return other.copy()
+
+        n = self.n + other.n
+        delta = other._mean - self._mean
+        mean = self._mean + delta * other.n / n
+        m2 = self.m2 + other.m2 + delta * delta * self.n * other.n / n
+
+        # Pairs inside each part
+        pa, pb = self.n - 1, other.n - 1
+        pairs = pa + pb
+        if pairs:
+            dh = other.head_mean - self.head_mean
+            dt = other.tail_mean - self.tail_mean
+            w = pa * pb / pairs
+            head_mean = self.head_mean + dh * pb / pairs
+            tail_mean = self.tail_mean + dt * pb / pairs
+            head_m2 = self.head_m2 + other.head_m2 + dh * dh * w
+            tail_m2 = self.tail_m2 + other.tail_m2 + dt * dt * w
+            cross = self.cross + other.cross + dh * dt * w
+        else:
+            head_mean = tail_mean = head_m2 = tail_m2 = cross = 0.0
+
+        merged = StatsAccumulator.from_moments(
+            n, mean, m2, self.first, other.last,
+            head_mean, tail_mean, head_m2, tail_m2, cross)
+
+        # Bridging pair (self.last, other.first)
+        a, b = self.last, other.first
+        k = pairs + 1
+        da = a - merged.head_mean
+        db = b - merged.tail_mean
+        merged.head_mean += da / k
+        merged.tail_mean += db / k
+        merged.head_m2 += da * (a - merged.head_mean)
+        merged.tail_m2 += db * (b - merged.tail_mean)
+        merged.cross += da * (b - merged.tail_mean)
+        return merged
+
+    def _assign(self, other):
+        self.__dict__.update(other.__dict__)
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def mean(self):
+        return self._mean
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else np.nan
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    @property
+    def autocorr(self):
+        denom = np.sqrt(self.head_m2 * self.tail_m2)
+        return self.cross / denom if denom > 0 else np.nan
+
+    def summary(self):
+        """Snapshot of the statistics as a Summary tuple."""
+        return Summary(self.n, self.mean, self.variance, self.std, self.autocorr)
+
+    def __repr__(self):
+        return (f"StatsAccumulator(n={self.n}, mean={self.mean:.4g}, "
+                f"variance={self.variance:.4g}, autocorr={self.autocorr:.4g})")
+
@@ -0,0 +1,93 @@
+"""
+Batch Due Date Engine
+=====================
+Vectorized version of calculate_due_date() for pricing many orders at once.
+
+The statistics of the data are computed a single time and the normal
+quantile is evaluated once for the whole confidence vector, so quoting
+thousands of (boats, confidence) pairs costs a handful of NumPy operations.
+"""
+
+import numpy as np
+
+from . import normal
+from .summary import summarize
+
+
+# Same fields as the dict returned by calculate_due_date(), plus the inputs
+RESULT_DTYPE = np.dtype([
+    ('boats_needed', 'f8'),
+    ('confidence_level', 'f8'),
+    ('mean', 'f8'),
+    ('std', 'f8'),
+    ('variance', 'f8'),
+    ('autocorr', 'f8'),
+    ('mu_b', 'f8'),
+    ('sigma_b', 'f8'),
+    ('z_score', 'f8'),
+    ('due_date_hours', 'f8'),
+    ('due_date_days', 'f8'),
+    ('average_days', 'f8'),
+    ('safety_time_days', 'f8'),
+])
+
+
+def due_date_from_summary(summary, boats_needed, confidence_level,
+                          variance_multiplier=None):
+    """
+    Apply the due date formula to precomputed statistics.
+
+    boats_needed and confidence_level may be scalars or arrays; they are
+    broadcast against each other and the result has the broadcast shape.
+    The summary fields may be arrays too (e.g. luxboat.rolling estimates).
+    variance_multiplier overrides (1+rho)/(1-rho), e.g. with the all-lags
+    multiplier from luxboat.acf (broadcastable against boats_needed).
+    """
+    boats, conf, _ = np.broadcast_arrays(
+        np.asarray(boats_needed, dtype=float),
+        np.asarray(confidence_level, dtype=float),
+        np.asarray(summary.mean, dtype=float),
+    )
+
+    # Lag-1 multiplier only depends on the data, not on the order
+    if variance_multiplier is None:
+        variance_multiplier = (1 + summary.autocorr) / (1 - summary.autocorr)
+
+    mu_b = boats * summary.mean
+    sigma_b = np.sqrt(variance_multiplier * boats * summary.variance)
+    # Quantiles of the un-broadcast confidence levels (often a single value)
+    z_score = normal.ppf(np.asarray(confidence_level, dtype=float))
+    due_date_hours = mu_b + z_score * sigma_b
+
+    results = np.empty(boats.shape, dtype=RESULT_DTYPE)
+    results['boats_needed'] = boats
+    results['confidence_level'] = conf
+    results['mean'] = summary.mean
+    results['std'] = summary.std
+    results['variance'] = summary.variance
+    results['autocorr'] = summary.autocorr
+    results['mu_b'] = mu_b
+    results['sigma_b'] = sigma_b
+    results['z_score'] = z_score
+    results['due_date_hours'] = due_date_hours
+    results['due_date_days'] = due_date_hours / 24
+    results['average_days'] = mu_b / 24
+    results['safety_time_days'] = results['due_date_days'] - results['average_days']
+    return results
+
+
+def calculate_due_date_batch(data, boats_needed, confidence_level):
+    """
+    Calculate due dates for many (boats, confidence) pairs in one pass.
+
+    data can be the raw inter-throughput series or a precomputed Summary.
+    Returns a structured array with RESULT_DTYPE fields.
+    """
+    return due_date_from_summary(summarize(data), boats_needed, confidence_level)
+
+
+def results_to_frame(results):
+    """Convert a batch result array into a pandas DataFrame."""
+    import pandas as pd
+
+    return pd.DataFrame(np.atleast_1d(results).ravel())
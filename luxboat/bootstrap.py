@@ -0,0 +1,99 @@
+"""
+Moving-Block Bootstrap of the Due Date
+======================================
+calculate_due_date() plugs the sample mean, variance and rho_1 into the
+formula as if they were exact. With 29 observations they are not, and the
+due date inherits their estimation error.
+
+The moving-block bootstrap resamples the series as concatenated blocks of
+consecutive observations, so the autocorrelation within each block is
+kept (an i.i.d. bootstrap would destroy it and push rho_1 towards zero).
+Each resample gives a new (mean, variance, rho_1) and therefore a new due
+date; their spread is the uncertainty of the quote.
+
+All resamples of a chunk are one 2-D index array (resamples x n) and the
+statistics are reductions along axis 1, so 10^5 resamples of the example
+data take a few tens of milliseconds.
+"""
+
+import numpy as np
+
+from .batch import due_date_from_summary
+from .summary import Summary
+
+
+DEFAULT_RESAMPLES = 10_000
+
+# Index entries per chunk, bounds memory for long series
+CHUNK_ELEMENTS = 1 << 22
+
+
+def default_block_length(n):
+    """Block length ~ n^(1/3), the usual rate for variance-type statistics."""
+    return max(1, int(round(n ** (1 / 3))))
+
+
+def block_indices(n, n_resamples, block_length, rng):
+    """
+    (n_resamples, n) indices of moving-block resamples of a length-n series.
+
+    Each row concatenates ceil(n / block_length) blocks starting at uniform
+    random positions, cut to n entries.
+    """
+    if not 1 <= block_length <= n:
+        raise ValueError("block_length must be between 1 and the series length")
+    n_blocks = -(-n // block_length)
+    starts = rng.integers(0, n - block_length + 1, size=(n_resamples, n_blocks))
+    idx = starts[:, :, None] + np.arange(block_length)
+    return idx.reshape(n_resamples, n_blocks * block_length)[:, :n]
+
+
+def resample_summary(samples):
+    """Summary of every row of a (resamples, n) array, as arrays."""
+    n = samples.shape[1]
+    means = samples.mean(axis=1)
+    variances = samples.var(axis=1, ddof=1)
+    # Lag-1 autocorrelation per row, same definition as np.corrcoef
+    head = samples[:, :-1] - samples[:, :-1].mean(axis=1, keepdims=True)
+    tail = samples[:, 1:] - samples[:, 1:].mean(axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        autocorrs = np.einsum('ij,ij->i', head, tail) / np.sqrt(
+            np.einsum('ij,ij->i', head, head) * np.einsum('ij,ij->i', tail, tail))
+    return Summary(np.full(means.shape, n), means, variances, np.sqrt(variances),
+                   autocorrs)
+
+
+def bootstrap_due_dates(data, boats_needed, confidence_level,
+                        n_resamples=DEFAULT_RESAMPLES, block_length=None,
+                        seed=None):
+    """
+    Due dates recomputed on moving-block resamples of data.
+
+    Returns a RESULT_DTYPE array with one row per resample (rows whose
+    resample has no variation are NaN).
+    """
+    values = np.asarray(data, dtype=float)
+    if values.ndim != 1 or values.size < 3:
+        raise ValueError("need a 1-D series with at least 3 observations")
+    n = values.size
+    if block_length is None:
+        block_length = default_block_length(n)
+    rng = np.random.default_rng(seed)
+
+    chunk = max(1, CHUNK_ELEMENTS // n)
+    parts = []
+    for start in range(0, int(n_resamples), chunk):
+        size = min(chunk, int(n_resamples) - start)
+        samples = values[block_indices(n, size, block_length, rng)]
+        parts.append(resample_summary(samples))
+    summary = Summary(*(np.concatenate(field) for field in zip(*parts)))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return due_date_from_summary(summary, boats_needed, confidence_level)
+
+
+def interval(samples, level=0.9):
+    """Equal-tailed percentile interval (low, high) ignoring NaN rows."""
+    tail = (1 - level) / 2 * 100
+    low, high = np.nanpercentile(samples, [tail, 100 - tail])
+    return float(low), float(high)
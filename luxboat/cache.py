@@ -0,0 +1,151 @@
+"""
+Shared Results Cache
+====================
+Process-wide, bounded LRU cache for due date results.
+
+Every Shiny session on a worker shares the same cache, so 200 users looking
+at the default dataset trigger one calculation per (boats, confidence) pair
+instead of one per session per slider move. Keys are a content hash of the
+dataset plus the order parameters, so identical pasted data also hits.
+"""
+
+import contextvars
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+# Values hashed per update; a memory-mapped upload is read a chunk at a time
+_HASH_CHUNK = 1 << 20
+
+
+def fingerprint(data):
+    """Content hash of a dataset (independent of list vs array input)."""
+    values = np.asarray(data)
+    if values.ndim != 1:
+        values = values.reshape(-1)
+    digest = hashlib.blake2b(digest_size=16)
+    for lo in range(0, values.size, _HASH_CHUNK):
+        chunk = np.ascontiguousarray(values[lo:lo + _HASH_CHUNK], dtype=np.float64)
+        digest.update(memoryview(chunk).cast('B'))
+    return digest.hexdigest()
+
+
+# [hits, misses] of the innermost call timed by luxboat.metrics in this
+# context (thread or task); None when no timed call is running
+LOOKUPS = contextvars.ContextVar('luxboat_cache_lookups', default=None)
+
+
+def count_lookup(hit):
+    """Attribute one cache lookup to the running timed call, if any."""
+    counts = LOOKUPS.get()
+    if counts is not None:
+        counts[0 if hit else 1] += 1
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache with hit/miss/eviction counters.
+
+    maxbytes additionally bounds the total len() of the values (for caches
+    of bytes); a value larger than that on its own is not stored.
+    """
+
+    def __init__(self, maxsize=1024, maxbytes=None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._entries[key]
+                hit = True
+            except KeyError:
+                value, hit = default, False
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        count_lookup(hit)
+        return value
+
+    def put(self, key, value):
+        size = len(value) if self.maxbytes is not None else 0
+        if self.maxbytes is not None and size > self.maxbytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None and self.maxbytes is not None:
+                self._nbytes -= len(old)
+            self._entries[key] = value
+            self._nbytes += size
+            while len(self._entries) > self.maxsize or (
+                    self.maxbytes is not None and self._nbytes > self.maxbytes):
+                _, evicted = self._entries.popitem(last=False)
+                if self.maxbytes is not None:
+                    self._nbytes -= len(evicted)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, calling compute() on a miss."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            # Computed outside the lock so slow misses don't block hits
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Counters for monitoring."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'nbytes': self._nbytes if self.maxbytes is not None else None,
+                'maxbytes': self.maxbytes,
+            }
+
+
+# Shared by every session in this process
+RESULTS_CACHE = LRUCache(maxsize=4096)
+
+
+def cached_due_date(calculate, data, boats_needed, confidence_level,
+                    cache=RESULTS_CACHE, data_key=None):
+    """
+    Memoized call to calculate(data, boats_needed, confidence_level).
+
+    data_key can be passed when the dataset fingerprint is already known, to
+    skip hashing the data again. Returns a fresh dict so callers can't
+    modify the shared entry.
+    """
+    if data_key is None:
+        data_key = fingerprint(data)
+    key = (data_key, getattr(calculate, '__qualname__', repr(calculate)),
+           float(boats_needed), float(confidence_level))
+    result = cache.get_or_compute(
+        key, lambda: calculate(data, boats_needed, confidence_level))
+    return dict(result)
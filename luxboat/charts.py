@@ -0,0 +1,118 @@
+"""
+Client-Side Vector Charts
+=========================
+Alternative to the PNG backend in luxboat.plots: the server sends only the
+numbers a plot is made of (bin counts, curve points, marker positions) as a
+small JSON spec, and luxchart.js draws it as SVG in the browser.
+
+The backend is chosen per deployment with the environment variable
+LUXBOAT_PLOT_BACKEND ('png', the default, or 'svg').
+
+Numbers are written with 5 significant digits, and long lines are reduced
+to a min/max envelope of at most MAX_LINE_POINTS points, so the spec size
+does not grow with the dataset.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from .cache import LRUCache
+
+
+PLOT_BACKEND = os.environ.get('LUXBOAT_PLOT_BACKEND', 'png').lower()
+if PLOT_BACKEND not in ('png', 'svg'):
+    raise ValueError("LUXBOAT_PLOT_BACKEND must be 'png' or 'svg'")
+
+# Browser-side renderer, included in the page with ui.include_js()
+SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           'www', 'luxchart.js')
+
+MAX_LINE_POINTS = 2000
+
+# Serialized specs, shared by every session (a few KB per entry)
+CHART_CACHE = LRUCache(maxsize=512)
+
+
+def _numbers(values):
+    """Round to 5 significant digits for a compact JSON encoding (NaN -> null)."""
+    values = np.atleast_1d(np.asarray(values, dtype=float))
+    rounded = np.char.mod('%.5g', values)
+    return [float(v) if ok else None for v, ok in zip(rounded, np.isfinite(values))]
+
+
+def decimate(x, y, max_points=MAX_LINE_POINTS):
+    """
+    Reduce a line to the min and max of each of max_points // 2 buckets.
+
+    Keeps the visible envelope of long series (spikes included) at a fixed
+    number of points.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    buckets = max_points // 2
+    if y.size <= max_points:
+        return x, y
+    size = -(-y.size // buckets)
+    pad = buckets * size - y.size
+    padded = np.concatenate([y, np.full(pad, np.nan)]).reshape(buckets, size)
+    lo = np.nanargmin(padded, axis=1) + np.arange(buckets) * size
+    hi = np.nanargmax(padded, axis=1) + np.arange(buckets) * size
+    index = np.sort(np.stack([lo, hi], axis=1), axis=1).ravel()
+    return x[index], y[index]
+
+
+class Chart:
+    """Builder for a chart spec; mark methods return self for chaining."""
+
+    def __init__(self, title='', xlabel='', ylabel='', figsize=(10, 6)):
+        self.spec = {'title': title, 'xlabel': xlabel, 'ylabel': ylabel,
+                     'aspect': [figsize[0], figsize[1]], 'marks': []}
+
+    def _mark(self, kind, color, label, **fields):
+        mark = {'type': kind, 'color': color, **fields}
+        if label:
+            mark['label'] = label
+        self.spec['marks'].append(mark)
+        return self
+
+    def bars(self, edges, heights, color, label=None, opacity=0.7):
+        """Histogram bars between consecutive edges."""
+        return self._mark('bars', color, label, edges=_numbers(edges),
+                          heights=_numbers(heights), opacity=opacity)
+
+    def line(self, x, y, color, label=None, width=2, dash=False, markers=False):
+        x, y = decimate(x, y)
+        return self._mark('line', color, label, x=_numbers(x), y=_numbers(y),
+                          width=width, dash=dash, markers=markers)
+
+    def area(self, x, y, color, label=None, opacity=0.3):
+        """Filled area between the curve and zero."""
+        x, y = decimate(x, y)
+        return self._mark('area', color, label, x=_numbers(x), y=_numbers(y),
+                          opacity=opacity)
+
+    def vline(self, x, color, label=None, dash=True):
+        return self._mark('vline', color, label, x=_numbers(x)[0], dash=dash)
+
+    def hline(self, y, color, label=None, dash=True):
+        return self._mark('hline', color, label, y=_numbers(y)[0], dash=dash)
+
+    def errorbar(self, x, y, low, high, color, label=None):
+        """Point at (x, y) with a horizontal range from low to high."""
+        return self._mark('errorbar', color, label, x=_numbers(x)[0],
+                          y=_numbers(y)[0], low=_numbers(low)[0],
+                          high=_numbers(high)[0])
+
+    def to_json(self):
+        return json.dumps(self.spec, separators=(',', ':'), allow_nan=False)
+
+
+def cached_chart(key, build, cache=CHART_CACHE):
+    """
+    JSON spec for key, calling build() (which returns a Chart) on a miss.
+
+    key must capture every input the chart depends on.
+    """
+    return cache.get_or_compute(key, lambda: build().to_json())
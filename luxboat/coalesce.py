@@ -0,0 +1,143 @@
+"""
+Coalesced Updates
+=================
+While a slider is dragged, the browser sends a new value whenever the
+pointer pauses briefly, and every message is a full reactive flush. The
+value boxes are cheap and should follow every tick; plots only need the
+position the slider comes to rest on.
+
+Settled follows a reactive expression and passes its value on only once it
+has not changed for `delay` seconds. Renderers that read the settled value
+run once per pause instead of once per tick: intermediate positions are
+dropped without starting any plot work, and the plots are rendered in a
+later flush than the value boxes, so the boxes reach the browser first.
+
+The delay is set with LUXBOAT_SETTLE_SECONDS (default 0.3, 0 disables).
+
+Offloaded runs the expensive part of an output on luxboat.workers'
+thread pool, keeping only the latest inputs: when they change, the job
+for the previous ones is cancelled (if it has not started) or its result
+is dropped (if it has), and the new job takes its place. The event loop
+serves other sessions in the meantime.
+
+Needs Shiny; import it from luxboat.coalesce directly.
+"""
+
+import os
+import time
+
+from shiny import reactive
+from shiny.module import ResolvedId
+from shiny.session import get_current_session
+
+from .metrics import timed
+from .workers import WORKER_POOL
+
+
+SETTLE_SECONDS = float(os.environ.get('LUXBOAT_SETTLE_SECONDS', '0.3'))
+
+
+class Settled:
+    """
+    Value of source() once it stops changing for delay seconds.
+
+    Create it inside the server function. source should only read inputs
+    (it runs in an effect, so an exception there ends the session). The
+    first value is passed on immediately.
+    """
+
+    def __init__(self, source, delay=SETTLE_SECONDS):
+        self.source = source
+        self.delay = delay
+        if delay <= 0:
+            return
+        self._settled = reactive.value()
+        self._deadline = reactive.value(None)
+        self._pending = None
+
+        # Runs before the outputs of the same flush read the value
+        @reactive.effect(priority=1)
+        def _follow():
+            value = source()
+            with reactive.isolate():
+                if not self._settled.is_set():
+                    self._settled.set(value)
+                elif value != self._settled() or self._deadline() is not None:
+                    self._pending = value
+                    self._deadline.set(time.monotonic() + self.delay)
+
+        @reactive.effect
+        def _release():
+            deadline = self._deadline()
+            if deadline is None:
+                return
+            remaining = deadline - time.monotonic()
+            if remaining > 0:
+                reactive.invalidate_later(remaining)
+                return
+            with reactive.isolate():
+                self._deadline.set(None)
+                if self._pending != self._settled():
+                    self._settled.set(self._pending)
+
+    def __call__(self):
+        if self.delay <= 0:
+            return self.source()
+        return self._settled()
+
+
+class Offloaded:
+    """
+    Latest-only background job of one session, run on a WorkerPool.
+
+    prepare() is reactive: it reads inputs and calcs on the event loop and
+    returns a function of no arguments that does the CPU work (it must not
+    touch inputs or calcs). Use as a decorator and read result() in a
+    renderer; the output shows as recalculating while the job runs.
+    Exceptions raised by prepare() (req(), SafeException) are raised again
+    by result().
+
+    output is the id of the output that shows the result, if any. Effects
+    are never suspended, so the job only starts while that output is
+    visible, the way Shiny suspends hidden renderers.
+    """
+
+    def __init__(self, prepare, limit=None, pool=WORKER_POOL, output=None):
+        self._pool = pool
+        self._limit = limit
+        self._name = prepare.__name__
+        self._task = reactive.ExtendedTask(self._run)
+        self._error = reactive.value(None)
+        self._hidden = None
+        if output is not None:
+            session = get_current_session()
+            self._hidden = session.input[
+                ResolvedId(f".clientdata_output_{session.ns(output)}_hidden")]
+
+        # Runs before the renderers of the same flush read result()
+        @reactive.effect(priority=1)
+        def _start():
+            # Superseded: drop the queued or running job
+            self._task.cancel()
+            if self._hidden is not None and (not self._hidden.is_set()
+                                             or self._hidden()):
+                # Started again when the output is shown
+                return
+            try:
+                job = prepare()
+            except Exception as err:
+                self._error.set(err)
+                return
+            self._error.set(None)
+            self._task.invoke(job)
+
+    async def _run(self, job):
+        # Recorded under the name of prepare() when LUXBOAT_METRICS=1
+        job = timed(job, name=self._name)
+        return await self._pool.run(job, limit=self._limit)
+
+    def result(self):
+        error = self._error()
+        if error is not None:
+            raise error
+        return self._task.result()
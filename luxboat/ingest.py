@@ -0,0 +1,157 @@
+"""
+File Ingestion
+==============
+Reads inter-throughput times from large files without building Python lists.
+
+Supported formats (chosen from the file extension or the fmt argument):
+
+- binary:  raw little-endian float64 values (.bin, .f64, .dat),
+           memory-mapped with np.memmap so only the pages in use are read
+- csv:     one column of a CSV file, read in chunks with pandas
+- text:    one column of whitespace-separated values (.txt), likewise
+- parquet: one column of a Parquet file, read batch by batch with pyarrow
+
+A CSV or text file may start with a header row; it is detected from whether
+the first row holds a number in the selected column.
+
+Every reader yields float64 chunks, so the sufficient statistics can be
+computed in a single streaming pass with StatsAccumulator.
+"""
+
+import os
+import re
+
+import numpy as np
+
+from .accumulator import StatsAccumulator
+
+
+BINARY_DTYPE = np.dtype('<f8')
+DEFAULT_CHUNK_ROWS = 1 << 20
+
+FORMATS = {
+    '.bin': 'binary',
+    '.f64': 'binary',
+    '.dat': 'binary',
+    '.csv': 'csv',
+    '.txt': 'text',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+}
+
+
+def detect_format(path, fmt=None):
+    """File format from fmt or the file extension."""
+    if fmt is None:
+        fmt = FORMATS.get(os.path.splitext(str(path))[1].lower())
+    if fmt not in ('binary', 'csv', 'text', 'parquet'):
+        raise ValueError(f"Unsupported file format for {path!r}; "
+                         f"expected one of {sorted(FORMATS)}")
+    return fmt
+
+
+def open_binary(path):
+    """Memory-map a raw float64 file as a read-only array."""
+    size = os.path.getsize(path)
+    if size % BINARY_DTYPE.itemsize:
+        raise ValueError(f"{path!r} is not a whole number of float64 values")
+    if size == 0:
+        return np.empty(0, dtype=BINARY_DTYPE)
+    return np.memmap(path, dtype=BINARY_DTYPE, mode='r')
+
+
+def iter_chunks(path, column=None, chunk_rows=DEFAULT_CHUNK_ROWS, fmt=None):
+    """
+    Yield the values of a file as consecutive float64 arrays.
+
+    column selects the CSV/Parquet column by name or position (default: the
+    first column). Binary chunks are views into the memory map.
+    """
+    fmt = detect_format(path, fmt)
+
+    if fmt == 'binary':
+        values = open_binary(path)
+        for lo in range(0, values.size, chunk_rows):
+            yield values[lo:lo + chunk_rows]
+
+    elif fmt in ('csv', 'text'):
+        import pandas as pd
+
+        sep = ',' if fmt == 'csv' else r'\s+'
+        if column is None:
+            column = 0
+        # A column name needs the header; a position keeps the first row
+        # unless it is not numeric there
+        named = isinstance(column, str)
+        header = 0 if named or _has_header(path, sep, column) else None
+        for frame in pd.read_csv(path, sep=sep, header=header, usecols=[column],
+                                 chunksize=chunk_rows):
+            yield _to_float64(frame.iloc[:, 0].to_numpy(), path)
+
+    else:
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet files requires pyarrow "
+                              "(pip install pyarrow)") from None
+
+        parquet = pq.ParquetFile(path)
+        if column is None or isinstance(column, int):
+            column = parquet.schema_arrow.names[column or 0]
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=[column]):
+            yield _to_float64(batch.column(0).to_numpy(zero_copy_only=False), path)
+
+
+def _has_header(path, sep, column):
+    # First non-blank line; a header if its field at column is not a number
+    with open(path, newline='') as lines:
+        first = next((line for line in lines if line.strip()), '')
+    fields = re.split(sep, first.strip())
+    if column >= len(fields):
+        return False
+    try:
+        float(fields[column].strip().strip('"\''))
+    except ValueError:
+        return True
+    return False
+
+
+def _to_float64(values, path):
+    try:
+        values = np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise ValueError(f"{path!r} contains non-numeric values") from None
+    if not np.isfinite(values).all():
+        raise ValueError(f"{path!r} contains missing or non-finite values")
+    return values
+
+
+def accumulate_file(path, column=None, chunk_rows=DEFAULT_CHUNK_ROWS, fmt=None):
+    """
+    Sufficient statistics of a file in one streaming pass.
+
+    The result can be passed straight to calculate_due_date() or the batch
+    engine; memory use is bounded by chunk_rows.
+    """
+    acc = StatsAccumulator()
+    for chunk in iter_chunks(path, column, chunk_rows, fmt):
+        acc.extend(chunk)
+    return acc
+
+
+def load_file(path, column=None, chunk_rows=DEFAULT_CHUNK_ROWS, fmt=None):
+    """
+    All values of a file as one float64 array.
+
+    Binary files are returned as the read-only memory map itself, so they
+    are never copied into memory.
+    """
+    if detect_format(path, fmt) == 'binary':
+        return open_binary(path)
+    chunks = list(iter_chunks(path, column, chunk_rows, fmt))
+    return np.concatenate(chunks) if chunks else np.empty(0)
+
+
+def write_binary(path, values):
+    """Write values as raw little-endian float64 (the binary format above)."""
+    np.asarray(values, dtype=BINARY_DTYPE).tofile(path)
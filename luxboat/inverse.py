@@ -0,0 +1,108 @@
+"""
+Due Date Inversion
+==================
+Answers the reverse question of calculate_due_date(): how many boats can be
+promised within a deadline at a given confidence level?
+
+The due date for b boats is
+
+    T(b) = b * mean + z * c * sqrt(b),   c = sqrt((1+rho)/(1-rho) * S^2)
+
+which is a quadratic in u = sqrt(b):  mean * u^2 + z * c * u - T = 0.
+Its non-negative root gives the largest (fractional) b meeting the deadline,
+so every query is a handful of vectorized arithmetic operations.
+
+With a full-ACF variance (luxboat/acf.py) the multiplier depends on b, so
+the root is iterated to a fixed point of b -> multiplier(b) instead.
+"""
+
+import numpy as np
+
+from . import normal
+from .acf import variance_multiplier as acf_variance_multiplier
+from .cache import fingerprint
+from .summary import summarize
+
+
+# Fixed-point iterations for the full-ACF modes (b settles in a few)
+MAX_ITERATIONS = 20
+
+# Largest answer returned; every whole number up to it is exact as a float
+MAX_BOATS = 2 ** 53
+
+
+def boats_within_hours(summary, deadline_hours, confidence_level,
+                       variance_multiplier=None):
+    """
+    Fractional number of boats whose due date equals deadline_hours.
+
+    Broadcasts over deadlines and confidence levels. variance_multiplier
+    defaults to (1+rho)/(1-rho) from the summary.
+    """
+    hours = np.asarray(deadline_hours, dtype=float)
+    z = normal.ppf(np.asarray(confidence_level, dtype=float))
+
+    multiplier = variance_multiplier
+    if multiplier is None:
+        multiplier = (1 + summary.autocorr) / (1 - summary.autocorr)
+    c = np.sqrt(multiplier * summary.variance)
+    m = summary.mean
+
+    # Larger root of m u^2 + z c u - T = 0 (the only one >= 0 for T >= 0)
+    zc = z * c
+    u = (-zc + np.sqrt(zc * zc + 4 * m * np.maximum(hours, 0))) / (2 * m)
+    return u * u
+
+
+def max_boats_by_deadline(data, deadline_days, confidence_level,
+                          variance_mode='lag1'):
+    """
+    Largest whole number of boats deliverable within deadline_days.
+
+    data can be the raw series, a Summary or a StatsAccumulator. Returns an
+    integer (or integer array), 0 when not even one boat fits. variance_mode
+    is as in calculate_due_date(); the full-ACF modes need the raw series.
+    Raises ValueError when the data does not determine a due date (constant
+    times leave rho_1 undefined) or a deadline allows more than MAX_BOATS.
+    """
+    summary = summarize(data)
+    lag1 = (1 + summary.autocorr) / (1 - summary.autocorr)
+    finite = np.isfinite([summary.mean, summary.variance, lag1]).all()
+    if not finite or summary.mean <= 0 or lag1 < 0:
+        raise ValueError("the data does not determine a due date "
+                         "(it needs a positive mean, some variation and |rho_1| < 1)")
+
+    if variance_mode == 'lag1':
+        def multiplier(boats):
+            return lag1
+    elif hasattr(data, 'summary'):
+        raise ValueError("full-ACF variance needs the raw data, not an accumulator")
+    else:
+        data_key = fingerprint(data)
+
+        def multiplier(boats):
+            return acf_variance_multiplier(data, np.maximum(boats, 1),
+                                           window=variance_mode, data_key=data_key)
+
+    hours = np.asarray(deadline_days, dtype=float) * 24
+    boats = np.floor(boats_within_hours(summary, hours, confidence_level, lag1))
+    if not np.all(boats <= MAX_BOATS):
+        raise ValueError(f"deadline too long: more than {MAX_BOATS} boats fit")
+    if variance_mode != 'lag1':
+        for _ in range(MAX_ITERATIONS):
+            previous = boats
+            boats = np.floor(boats_within_hours(summary, hours, confidence_level,
+                                                multiplier(boats)))
+            if np.array_equal(boats, previous):
+                break
+        if not np.all(boats <= MAX_BOATS):
+            raise ValueError(f"deadline too long: more than {MAX_BOATS} boats fit")
+
+    # Guard against rounding right at an integer boundary
+    z = normal.ppf(np.asarray(confidence_level, dtype=float))
+    variance = multiplier(boats) * boats * summary.variance
+    due = boats * summary.mean + z * np.sqrt(variance)
+    boats = np.where(due > hours * (1 + 1e-12), boats - 1, boats)
+
+    boats = np.maximum(boats, 0).astype(np.int64)
+    return boats if boats.ndim else int(boats)
@@ -0,0 +1,100 @@
+"""
+Fused One-Pass Moments
+======================
+calculate_statistics() and calculate_autocorrelation() read a series about
+five times (mean, var, std, two slices, corrcoef) and allocate several
+temporaries of the same size. For archives of 10^8 observations the memory
+traffic is the cost, not the arithmetic.
+
+chunk_moments() reads each value once and returns everything a
+StatsAccumulator holds (n, mean, M2, the lag-1 pair moments). It works on
+chunks of CHUNK values, about 512 KiB, which stay in cache. Inside a chunk
+it accumulates three sums of the values shifted by the chunk's first
+value: sum(d), sum(d^2) and sum(d[i] d[i+1]). Shifting keeps the sums
+accurate. Chunks are then combined with the exact parallel merge
+(StatsAccumulator.merge).
+
+With Numba installed the sums are a compiled loop that runs without the GIL,
+so shards can be reduced on several threads. Without Numba, NumPy computes
+the same sums per chunk with one cache-sized temporary. LUXBOAT_NUMBA=0
+forces the NumPy path.
+"""
+
+import os
+
+import numpy as np
+
+try:
+    # Optional: compiled single loop, several times less memory traffic
+    import numba
+except ImportError:
+    numba = None
+
+
+HAVE_NUMBA = numba is not None and os.environ.get('LUXBOAT_NUMBA', '1') != '0'
+
+# Values per chunk (512 KiB of float64)
+CHUNK = 1 << 16
+
+# Values per shard reduced by one thread (several shards -> several threads)
+SHARD = 1 << 22
+
+# Series at least this long use the fused pass in summarize()
+FUSED_MIN_SIZE = CHUNK
+
+
+def _shifted_sums_numpy(values, start, stop):
+    d = values[start:stop] - values[start]
+    return d.sum(), np.dot(d, d), np.dot(d[:-1], d[1:])
+
+
+if HAVE_NUMBA:
+    @numba.njit(nogil=True, cache=True, fastmath={'reassoc', 'contract'})
+    def _shifted_sums_numba(values, start, stop):
+        shift = values[start]
+        s = q = c = prev = 0.0
+        for i in range(start, stop):
+            d = values[i] - shift
+            s += d
+            q += d * d
+            c += prev * d
+            prev = d
+        return s, q, c
+
+
+# (sum(d), sum(d^2), sum(d[i] d[i+1])) of d = values[start:stop] - values[start]
+shifted_sums = _shifted_sums_numba if HAVE_NUMBA else _shifted_sums_numpy
+
+
+def chunk_moments(values, start, stop):
+    """
+    StatsAccumulator moments of values[start:stop] from one pass.
+
+    Returns (n, mean, m2, first, last, head_mean, tail_mean, head_m2,
+    tail_m2, cross), the order of StatsAccumulator.from_moments().
+    """
+    n = stop - start
+    shift = values[start]
+    first, last = values[start], values[stop - 1]
+    s, q, c = shifted_sums(values, start, stop)
+
+    mean = shift + s / n
+    m2 = q - s * s / n
+    pairs = n - 1
+    if pairs == 0:
+        return (1, first, 0.0, first, last, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+    # Head x[:-1] drops the last value, tail x[1:] the first (whose d is 0)
+    d_last = last - shift
+    head_s, head_q = s - d_last, q - d_last * d_last
+    tail_s, tail_q = s, q
+    return (n, mean, max(m2, 0.0), first, last,
+            shift + head_s / pairs, shift + tail_s / pairs,
+            max(head_q - head_s * head_s / pairs, 0.0),
+            max(tail_q - tail_s * tail_s / pairs, 0.0),
+            c - head_s * tail_s / pairs)
+
+
+def chunk_bounds(size, chunk=CHUNK):
+    """(start, stop) of consecutive chunks covering size values."""
+    return [(start, min(start + chunk, size)) for start in range(0, size, chunk)]
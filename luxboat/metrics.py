@@ -0,0 +1,214 @@
+"""
+Hot-Path Instrumentation
+========================
+Optional call counts, wall time and cache hits for reactive calcs,
+renderers and API handlers, exposed in Prometheus text format.
+
+Instrumentation is switched on with the environment variable
+LUXBOAT_METRICS=1. When it is off, @timed returns the function unchanged,
+so leaving the decorators in place costs nothing.
+
+Time and cache hits are inclusive: a renderer that calls get_results()
+also counts the time and hits spent inside it. Hits are counted per call
+through a context variable (luxboat.cache.LOOKUPS), so lookups made by
+other sessions or worker threads at the same time are not attributed to it.
+
+Each timed call is also written to the 'luxboat.metrics' logger as a JSON
+line when that logger is enabled for DEBUG.
+"""
+
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from .acf import ACF_CACHE
+from .cache import LOOKUPS, RESULTS_CACHE
+from .charts import CHART_CACHE
+from .plots import FIGURES, PLOT_CACHE
+from .shared import SHARED_DATA
+from .surface import SURFACE_CACHE
+from .workers import WORKER_POOL
+
+
+ENABLED = os.environ.get('LUXBOAT_METRICS', '').lower() in ('1', 'true', 'yes', 'on')
+
+logger = logging.getLogger('luxboat.metrics')
+
+
+class Registry:
+    """Per-name counters plus the caches whose hits are attributed to calls."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = defaultdict(int)
+        self.errors = defaultdict(int)
+        self.seconds = defaultdict(float)
+        self.cache_hits = defaultdict(int)
+        self.cache_misses = defaultdict(int)
+        self.caches = {}
+        self.gauges = {}
+
+    def register_cache(self, name, cache):
+        self.caches[name] = cache
+
+    def register_gauge(self, name, help_text, func):
+        """Current value of func() exported as luxboat_<name>."""
+        self.gauges[name] = (help_text, func)
+
+    def observe(self, name, seconds, error=False, hits=0, misses=0):
+        with self._lock:
+            self.calls[name] += 1
+            self.seconds[name] += seconds
+            self.errors[name] += error
+            self.cache_hits[name] += hits
+            self.cache_misses[name] += misses
+
+    def reset(self):
+        with self._lock:
+            for counter in (self.calls, self.errors, self.seconds,
+                            self.cache_hits, self.cache_misses):
+                counter.clear()
+
+    def snapshot(self):
+        """All counters as plain dicts (for logs or JSON)."""
+        with self._lock:
+            calls = {
+                name: {
+                    'calls': self.calls[name],
+                    'errors': self.errors[name],
+                    'seconds': self.seconds[name],
+                    'cache_hits': self.cache_hits[name],
+                    'cache_misses': self.cache_misses[name],
+                }
+                for name in self.calls
+            }
+        return {
+            'enabled': ENABLED,
+            'calls': calls,
+            'caches': {name: cache.stats() for name, cache in self.caches.items()},
+            'gauges': {name: func() for name, (_, func) in self.gauges.items()},
+        }
+
+    def prometheus(self):
+        """Counters in the Prometheus text exposition format."""
+        snap = self.snapshot()
+        lines = []
+
+        def family(metric, kind, help_text, samples):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{metric}{{{label_text}}} {value}")
+
+        calls = sorted(snap['calls'].items())
+        family('luxboat_calls_total', 'counter', 'Calls per reactive/renderer/handler.',
+               [({'name': n}, c['calls']) for n, c in calls])
+        family('luxboat_errors_total', 'counter', 'Calls that raised.',
+               [({'name': n}, c['errors']) for n, c in calls])
+        family('luxboat_seconds_total', 'counter', 'Wall time spent in each call.',
+               [({'name': n}, repr(c['seconds'])) for n, c in calls])
+        family('luxboat_call_cache_hits_total', 'counter',
+               'Cache hits during each call.',
+               [({'name': n}, c['cache_hits']) for n, c in calls])
+        family('luxboat_call_cache_misses_total', 'counter',
+               'Cache misses during each call.',
+               [({'name': n}, c['cache_misses']) for n, c in calls])
+
+        caches = sorted(snap['caches'].items())
+        for field, kind in (('hits', 'counter'), ('misses', 'counter'),
+                            ('evictions', 'counter'), ('size', 'gauge')):
+            suffix = '_total' if kind == 'counter' else ''
+            family(f'luxboat_cache_{field}{suffix}', kind, f'Cache {field}.',
+                   [({'cache': n}, s[field]) for n, s in caches])
+
+        for name, (help_text, _) in sorted(self.gauges.items()):
+            family(f'luxboat_{name}', 'gauge', help_text,
+                   [({}, snap['gauges'][name])])
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+REGISTRY.register_cache('results', RESULTS_CACHE)
+REGISTRY.register_cache('plots', PLOT_CACHE)
+REGISTRY.register_cache('charts', CHART_CACHE)
+REGISTRY.register_cache('surfaces', SURFACE_CACHE)
+REGISTRY.register_cache('acf', ACF_CACHE)
+REGISTRY.register_cache('shared_data', SHARED_DATA)
+REGISTRY.register_gauge('shared_data_bytes', 'Bytes held by shared datasets.',
+                        SHARED_DATA.nbytes)
+REGISTRY.register_gauge('figures_live', 'Matplotlib figures not yet collected.',
+                        lambda: FIGURES.live)
+REGISTRY.register_gauge('figures_created', 'Matplotlib figures created.',
+                        lambda: FIGURES.created)
+REGISTRY.register_gauge('workers_running', 'Jobs running on the worker pool.',
+                        lambda: WORKER_POOL.running)
+REGISTRY.register_gauge('workers_waiting', 'Jobs waiting for a worker slot.',
+                        lambda: WORKER_POOL.waiting)
+REGISTRY.register_gauge('workers_completed', 'Worker pool jobs completed.',
+                        lambda: WORKER_POOL.completed)
+REGISTRY.register_gauge('workers_cancelled', 'Superseded worker pool jobs dropped.',
+                        lambda: WORKER_POOL.cancelled)
+
+
+def timed(func=None, *, name=None, registry=REGISTRY, enabled=None):
+    """
+    Record calls, wall time, errors and cache hits of func.
+
+    Use as @timed or @timed(name=...). Put it directly above the def, under
+    Shiny's @reactive.calc / @render.* decorators. Returns func untouched
+    when instrumentation is disabled.
+    """
+    if func is None:
+        return functools.partial(timed, name=name, registry=registry, enabled=enabled)
+    if not (ENABLED if enabled is None else enabled):
+        return func
+
+    label = name or func.__name__
+
+    def finish(start, token, error):
+        seconds = time.perf_counter() - start
+        hits, misses = LOOKUPS.get()
+        LOOKUPS.reset(token)
+        outer = LOOKUPS.get()
+        if outer is not None:
+            # Inclusive: the enclosing timed call counts these lookups too
+            outer[0] += hits
+            outer[1] += misses
+        registry.observe(label, seconds, error, hits, misses)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps({'name': label, 'seconds': seconds,
+                                     'error': error,
+                                     'cache_hits': hits}))
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            token = LOOKUPS.set([0, 0])
+            start = time.perf_counter()
+            error = True
+            try:
+                result = await func(*args, **kwargs)
+                error = False
+                return result
+            finally:
+                finish(start, token, error)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = LOOKUPS.set([0, 0])
+        start = time.perf_counter()
+        error = True
+        try:
+            result = func(*args, **kwargs)
+            error = False
+            return result
+        finally:
+            finish(start, token, error)
+    return wrapper
@@ -0,0 +1,126 @@
+"""
+Parallel Execution
+==================
+Runs large workloads built on the due date engines serially, on a thread
+pool or on a process pool, and always merges results in shard order.
+
+Randomized workloads get one independent RNG stream per shard from
+np.random.SeedSequence.spawn. Shards are fixed by the workload (not by the
+number of workers), so results are identical at any worker count.
+"""
+
+import os
+
+import numpy as np
+
+from .batch import calculate_due_date_batch
+from .bootstrap import block_indices, default_block_length, resample_summary
+from .simulate import simulate_totals
+from .summary import summarize
+
+
+EXECUTORS = ('serial', 'thread', 'process')
+
+
+def map_shards(func, shards, executor='serial', max_workers=None):
+    """
+    Apply func to every shard and return the results in shard order.
+
+    func and the shards must be picklable for executor='process'.
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(f"executor must be one of {EXECUTORS}")
+    shards = list(shards)
+
+    if executor == 'serial' or len(shards) <= 1:
+        return [func(shard) for shard in shards]
+
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(shards))
+    pool_class = ThreadPoolExecutor if executor == 'thread' else ProcessPoolExecutor
+    with pool_class(max_workers=max_workers) as pool:
+        return list(pool.map(func, shards))
+
+
+def spawn_seeds(seed, n_shards):
+    """Independent, reproducible child seeds for n_shards workers."""
+    return np.random.SeedSequence(seed).spawn(n_shards)
+
+
+def _split(n_items, shard_size):
+    """Shard sizes covering n_items, independent of the worker count."""
+    sizes = [shard_size] * (n_items // shard_size)
+    if n_items % shard_size:
+        sizes.append(n_items % shard_size)
+    return sizes
+
+
+# ----------------------------------------------------------------------
+# Workloads (module-level functions so process pools can pickle them)
+# ----------------------------------------------------------------------
+
+def _sweep_shard(args):
+    summary, boats, conf = args
+    return calculate_due_date_batch(summary, boats, conf)
+
+
+def confidence_sweep(data, boats_needed, confidence_levels,
+                     executor='serial', max_workers=None, shard_size=4096):
+    """
+    Batch due dates for every (boats, confidence) pair, sharded by boats.
+
+    Returns the same structured array as calculate_due_date_batch with shape
+    (len(boats_needed), len(confidence_levels)).
+    """
+    summary = summarize(data)
+    boats = np.atleast_1d(np.asarray(boats_needed, dtype=float))
+    conf = np.atleast_1d(np.asarray(confidence_levels, dtype=float))
+
+    rows = max(1, shard_size // conf.size)
+    shards = [(summary, boats[i:i + rows, None], conf[None, :])
+              for i in range(0, boats.size, rows)]
+    return np.concatenate(map_shards(_sweep_shard, shards, executor, max_workers))
+
+
+def _simulate_shard(args):
+    data, boats, n_paths, seed = args
+    return simulate_totals(data, boats, n_paths=n_paths, seed=seed)
+
+
+def parallel_simulate_totals(data, boats_needed, n_paths, seed=None,
+                             executor='serial', max_workers=None,
+                             shard_size=1 << 18):
+    """Monte Carlo totals from simulate_totals, sharded across workers."""
+    data = np.asarray(data, dtype=float)
+    sizes = _split(int(n_paths), shard_size)
+    seeds = spawn_seeds(seed, len(sizes))
+    shards = [(data, boats_needed, size, s) for size, s in zip(sizes, seeds)]
+    return np.concatenate(map_shards(_simulate_shard, shards, executor, max_workers))
+
+
+def _bootstrap_shard(args):
+    data, n_resamples, block_length, seed = args
+    rng = np.random.default_rng(seed)
+    idx = block_indices(data.size, n_resamples, block_length, rng)
+    summary = resample_summary(data[idx])
+    return np.column_stack([summary.mean, summary.variance, summary.autocorr])
+
+
+def bootstrap_statistics(data, n_resamples, seed=None, executor='serial',
+                         max_workers=None, shard_size=10_000, block_length=None):
+    """
+    Moving-block bootstrap of (mean, variance, lag-1 autocorr) of the series.
+
+    Blocks of block_length consecutive values (default ~ n^(1/3), see
+    luxboat.bootstrap) keep the autocorrelation that an i.i.d. resample
+    would destroy. Returns an (n_resamples, 3) array, identical for any
+    executor and worker count given the same seed and shard_size.
+    """
+    data = np.asarray(data, dtype=float)
+    if block_length is None:
+        block_length = default_block_length(data.size)
+    sizes = _split(int(n_resamples), shard_size)
+    seeds = spawn_seeds(seed, len(sizes))
+    shards = [(data, size, block_length, s) for size, s in zip(sizes, seeds)]
+    return np.concatenate(map_shards(_bootstrap_shard, shards, executor, max_workers))
@@ -0,0 +1,92 @@
+"""
+Inter-Throughput Data Parser
+============================
+Bulk parser for pasted data such as MES exports.
+
+Values may be separated by commas, semicolons, spaces, tabs or newlines in
+any mix. Well-formed input is converted in a single C-level pass with
+np.fromstring; only when that fails is the text scanned token by token to
+report exactly which entries are invalid and where they are.
+"""
+
+import math
+import re
+import warnings
+
+import numpy as np
+
+
+SEPARATORS = ',;'
+_TO_SPACES = str.maketrans(SEPARATORS, ' ' * len(SEPARATORS))
+_TOKEN = re.compile(r'[^\s,;]+')
+
+MAX_REPORTED = 10
+
+
+class DataParseError(ValueError):
+    """
+    Raised when pasted data contains invalid entries.
+
+    bad_tokens is a list of (index, line, column, token) tuples, with the
+    1-based position of each invalid entry.
+    """
+
+    def __init__(self, message, bad_tokens=()):
+        super().__init__(message)
+        self.bad_tokens = list(bad_tokens)
+
+
+def parse_times(text, min_count=3):
+    """
+    Parse inter-throughput times into a float64 array.
+
+    Raises DataParseError for invalid or non-finite entries, and when fewer
+    than min_count values are present.
+    """
+    spaced = text.translate(_TO_SPACES)
+    if not spaced.strip():
+        # fromstring would return [-1.] for text without any value
+        if min_count > 0:
+            raise DataParseError("No values found.")
+        return np.empty(0)
+
+    with warnings.catch_warnings():
+        # fromstring warns (instead of failing) when it stops early
+        warnings.simplefilter('error')
+        try:
+            values = np.fromstring(spaced, dtype=np.float64, sep=' ')
+        except (ValueError, DeprecationWarning):
+            values = None
+
+    if values is None or not np.isfinite(values).all():
+        values = _parse_slow(text)
+
+    if values.size < min_count:
+        raise DataParseError(
+            f"Need at least {min_count} values, found {values.size}.")
+    return values
+
+
+def _parse_slow(text):
+    """Token-by-token parse that collects the position of every bad entry."""
+    values = []
+    bad = []
+    for index, match in enumerate(_TOKEN.finditer(text), start=1):
+        token = match.group()
+        try:
+            value = float(token)
+        except ValueError:
+            value = math.nan
+        if not math.isfinite(value):
+            line = text.count('\n', 0, match.start()) + 1
+            column = match.start() - text.rfind('\n', 0, match.start())
+            bad.append((index, line, column, token))
+        values.append(value)
+
+    if bad:
+        shown = ", ".join(f"'{tok}' (value {i}, line {ln}, column {col})"
+                          for i, ln, col, tok in bad[:MAX_REPORTED])
+        more = f" and {len(bad) - MAX_REPORTED} more" if len(bad) > MAX_REPORTED else ""
+        raise DataParseError(
+            f"{len(bad)} invalid value(s): {shown}{more}.", bad)
+    return np.array(values, dtype=np.float64)
@@ -0,0 +1,99 @@
+"""
+Cached Plot Rendering
+=====================
+Renders Matplotlib drawings to PNG bytes and caches the bytes, keyed on the
+inputs that actually affect each plot.
+
+Figures are created with matplotlib.figure.Figure instead of pyplot, so they
+never enter pyplot's global registry, and they are cleared as soon as the
+PNG is encoded. A cache hit returns the stored bytes without importing or
+touching Matplotlib at all.
+
+FIGURES counts figures created, cleared and garbage collected, so a leak
+shows up as a growing number of live figures (see luxboat.metrics).
+"""
+
+import base64
+import io
+import threading
+import weakref
+
+from .cache import LRUCache
+
+
+# Shared by every session in this process (roughly 50-100 KB per entry)
+PLOT_CACHE = LRUCache(maxsize=256)
+
+DEFAULT_DPI = 96
+
+
+class FigureTracker:
+    """Lifetime counters for the figures created by figure_png()."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.created = 0
+        self.cleared = 0
+        self.collected = 0
+
+    def track(self, fig):
+        with self._lock:
+            self.created += 1
+        weakref.finalize(fig, self._collected)
+
+    def _collected(self):
+        with self._lock:
+            self.collected += 1
+
+    def mark_cleared(self):
+        with self._lock:
+            self.cleared += 1
+
+    @property
+    def live(self):
+        """Figures not garbage collected yet."""
+        return self.created - self.collected
+
+    def stats(self):
+        return {'created': self.created, 'cleared': self.cleared,
+                'collected': self.collected, 'live': self.live}
+
+
+FIGURES = FigureTracker()
+
+
+def figure_png(draw, figsize, dpi=DEFAULT_DPI):
+    """
+    Draw onto a fresh Axes and return the figure encoded as PNG bytes.
+
+    draw is called with the Axes; the figure is released afterwards.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    FIGURES.track(fig)
+    try:
+        draw(fig.add_subplot())
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png')
+        return buffer.getvalue()
+    finally:
+        fig.clear()
+        FIGURES.mark_cleared()
+
+
+def cached_png(key, draw, figsize, dpi=DEFAULT_DPI, cache=PLOT_CACHE):
+    """
+    PNG bytes for key, rendering with figure_png() only on a cache miss.
+
+    key must capture every input the drawing depends on.
+    """
+    return cache.get_or_compute(
+        (key, tuple(figsize), dpi), lambda: figure_png(draw, figsize, dpi))
+
+
+def png_data_uri(png):
+    """Encode PNG bytes as a data: URI for an <img> tag."""
+    return "data:image/png;base64," + base64.b64encode(png).decode('ascii')
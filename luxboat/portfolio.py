@@ -0,0 +1,60 @@
+"""
+Portfolio Due Dates
+===================
+Several orders queued on the same line: order k is finished when all boats
+of orders 1..k are, so its completion time is the time to build the
+cumulative number of boats
+
+    B_k = b_1 + ... + b_k
+
+and its variance is that of the B_k-boat total. Adding up the per-order
+variances instead would drop the correlation between consecutive orders
+(the last boats of one order and the first of the next are neighbours in
+the series), and understate the spread for autocorrelated data.
+
+All orders are priced in one pass: a cumulative sum of the order sizes,
+then the due date formula of calculate_due_date() on the B_k vector. The
+cost is linear in the number of orders.
+"""
+
+import numpy as np
+
+from .acf import variance_multiplier as acf_variance_multiplier
+from .batch import RESULT_DTYPE, due_date_from_summary
+from .summary import summarize
+
+
+# RESULT_DTYPE with boats_needed = B_k, plus the order's own position and size
+PORTFOLIO_DTYPE = np.dtype([('order', 'i8'), ('order_boats', 'f8')]
+                           + RESULT_DTYPE.descr)
+
+
+def portfolio_due_dates(data, orders, confidence_level, variance_mode='lag1'):
+    """
+    Due date of every order in a queue, in queue order.
+
+    orders is the list of order sizes (boats) in the order they will be
+    built; confidence_level is one value or one per order. variance_mode is
+    as in calculate_due_date(); the full-ACF modes need the raw series.
+    Returns a PORTFOLIO_DTYPE array; its boats_needed field holds B_k.
+    """
+    sizes = np.asarray(orders, dtype=float)
+    if sizes.ndim != 1 or sizes.size == 0:
+        raise ValueError("orders must be a non-empty list of order sizes")
+    if np.any(sizes < 1) or not np.isfinite(sizes).all():
+        raise ValueError("every order needs at least 1 boat")
+
+    cumulative = np.cumsum(sizes)
+    multiplier = None
+    if variance_mode != 'lag1':
+        multiplier = acf_variance_multiplier(data, cumulative, window=variance_mode)
+
+    results = due_date_from_summary(summarize(data), cumulative,
+                                    confidence_level, variance_multiplier=multiplier)
+
+    portfolio = np.empty(results.shape, dtype=PORTFOLIO_DTYPE)
+    portfolio['order'] = np.arange(1, sizes.size + 1)
+    portfolio['order_boats'] = sizes
+    for name in RESULT_DTYPE.names:
+        portfolio[name] = results[name]
+    return portfolio
@@ -0,0 +1,237 @@
+"""
+Dataset Registry
+================
+Named inter-throughput series (one per production line or hull model), each
+stored with its running statistics so switching datasets never rescans the
+data.
+
+Every Dataset keeps a StatsAccumulator (n, mean, M2 and the lag-1 pair
+moments) that append() updates in O(len(new values)), and a cache key that
+is chained from the previous key and the new values, so it is also updated
+without rehashing the history. The values of an appended dataset sit at
+the front of a buffer with spare room that doubles when full, so storing
+them is amortized O(len(new values)) too (at up to twice the memory).
+
+The registry saves to a single uncompressed .npz file: all values
+concatenated into one float64 array plus offsets, the accumulator moments
+and the keys. Loading reads a few arrays and slices views, without
+recomputing anything. The file named by the LUXBOAT_DATASETS environment
+variable is loaded into DATASETS at import (if it exists). The API writes
+DATASETS back to it after every change it makes, so appends survive a
+restart; other callers persist with save().
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from .accumulator import StatsAccumulator
+from .cache import fingerprint
+from .ingest import load_file
+
+
+FORMAT_VERSION = 1
+
+# Columns of the stored moments array (see StatsAccumulator.to_moments)
+MOMENT_FIELDS = ('n', 'mean', 'm2', 'first', 'last', 'head_mean', 'tail_mean',
+                 'head_m2', 'tail_m2', 'cross')
+
+
+def _chain_key(key, values):
+    """Cache key for the data of `key` followed by `values`."""
+    digest = hashlib.blake2b(key.encode(), digest_size=16)
+    digest.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def _read_only(values):
+    values = np.array(values, dtype=np.float64)
+    values.flags.writeable = False
+    return values
+
+
+class Dataset:
+    """One named series with its statistics and cache key."""
+
+    def __init__(self, name, values, group='', label=None, acc=None, key=None):
+        self.name = name
+        self.group = group
+        self.label = label or name
+        self.values = values
+        self.acc = acc if acc is not None else StatsAccumulator(values)
+        self.key = key if key is not None else fingerprint(values)
+
+    def __len__(self):
+        return self.acc.n
+
+    def summary(self):
+        return self.acc.summary()
+
+    def __repr__(self):
+        return f"Dataset({self.name!r}, group={self.group!r}, n={len(self)})"
+
+
+class DatasetRegistry:
+    """Thread-safe name -> Dataset mapping with compact persistence."""
+
+    def __init__(self):
+        self._datasets = {}
+        # name -> (buffer, used): the current values are buffer[:used]
+        self._buffers = {}
+        self._lock = threading.Lock()
+        # Saves write whole snapshots; one at a time keeps the newest last
+        self._save_lock = threading.Lock()
+        # Bumped by every change, for caches keyed on dataset names
+        self.version = 0
+
+    def add(self, name, values, group='', label=None):
+        """Add (or replace) a dataset."""
+        values = _read_only(values)
+        if values.ndim != 1 or values.size < 3 or not np.isfinite(values).all():
+            raise ValueError(f"dataset {name!r} needs at least 3 finite values")
+        dataset = Dataset(name, values, group, label)
+        with self._lock:
+            self._datasets[name] = dataset
+            self._buffers.pop(name, None)
+            self.version += 1
+        return dataset
+
+    def add_file(self, name, path, group='', label=None, column=None):
+        """Add a dataset from a CSV, Parquet or binary file (see luxboat.ingest)."""
+        return self.add(name, load_file(path, column), group, label)
+
+    def append(self, name, values):
+        """
+        Add new observations to a dataset.
+
+        Statistics and key are updated from the new values only. The
+        Dataset object is replaced, so readers holding the old one keep a
+        consistent snapshot.
+        """
+        new = np.asarray(values, dtype=np.float64).ravel()
+        if not np.isfinite(new).all():
+            raise ValueError("values must be finite numbers")
+        with self._lock:
+            old = self._datasets[name]
+            acc = old.acc.copy()
+            acc.extend(new)
+            dataset = Dataset(name, self._extend(name, old.values, new),
+                              old.group, old.label, acc=acc,
+                              key=_chain_key(old.key, new))
+            self._datasets[name] = dataset
+            self.version += 1
+        return dataset
+
+    def _extend(self, name, values, new):
+        # Older snapshots are views of the buffer's front, which never
+        # changes; only the spare room behind them is written
+        size = values.size + new.size
+        buffer, used = self._buffers.get(name, (None, 0))
+        if buffer is None or used != values.size or buffer.size < size:
+            buffer = np.empty(max(size, 2 * values.size), dtype=np.float64)
+            buffer[:values.size] = values
+        buffer[values.size:size] = new
+        self._buffers[name] = (buffer, size)
+        extended = buffer[:size]
+        extended.flags.writeable = False
+        return extended
+
+    def remove(self, name):
+        with self._lock:
+            del self._datasets[name]
+            self._buffers.pop(name, None)
+            self.version += 1
+
+    def __getitem__(self, name):
+        return self._datasets[name]
+
+    def get(self, name, default=None):
+        return self._datasets.get(name, default)
+
+    def __contains__(self, name):
+        return name in self._datasets
+
+    def __len__(self):
+        return len(self._datasets)
+
+    def __iter__(self):
+        return iter(list(self._datasets.values()))
+
+    def names(self, group=None):
+        return [d.name for d in self if group is None or d.group == group]
+
+    def groups(self):
+        """Group names in order of first appearance."""
+        return list(dict.fromkeys(d.group for d in self))
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path):
+        """
+        Write every dataset to one uncompressed .npz file.
+
+        The file is replaced atomically, so a reader never sees a partly
+        written registry.
+        """
+        with self._save_lock:
+            self._save(path)
+
+    def _save(self, path):
+        datasets = list(self)
+        lengths = [d.values.size for d in datasets]
+        moments = [[np.nan if v is None else v for v in d.acc.to_moments()]
+                   for d in datasets]
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.npz.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(
+                    f,
+                    version=np.array(FORMAT_VERSION),
+                    names=np.array([d.name for d in datasets], dtype=str),
+                    groups=np.array([d.group for d in datasets], dtype=str),
+                    labels=np.array([d.label for d in datasets], dtype=str),
+                    keys=np.array([d.key for d in datasets], dtype=str),
+                    offsets=np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)]),
+                    values=(np.concatenate([d.values for d in datasets])
+                            if datasets else np.empty(0)),
+                    moments=np.array(moments, dtype=np.float64).reshape(
+                        -1, len(MOMENT_FIELDS)),
+                )
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """Read a registry written by save()."""
+        registry = cls()
+        with np.load(path, allow_pickle=False) as stored:
+            if int(stored['version']) != FORMAT_VERSION:
+                raise ValueError(f"{path!r}: unsupported registry format "
+                                 f"version {int(stored['version'])}")
+            # Each NpzFile lookup reads the member again, so read them once
+            values = stored['values']
+            values.flags.writeable = False
+            offsets = stored['offsets'].tolist()
+            rows = zip(stored['names'].tolist(), stored['groups'].tolist(),
+                       stored['labels'].tolist(), stored['keys'].tolist(),
+                       stored['moments'].tolist())
+            for i, (name, group, label, key, moments) in enumerate(rows):
+                registry._datasets[name] = Dataset(
+                    name, values[offsets[i]:offsets[i + 1]], group, label,
+                    acc=StatsAccumulator.from_moments(*moments), key=key)
+        return registry
+
+
+DATASETS_PATH = os.environ.get('LUXBOAT_DATASETS')
+
+# Registry shown in the app's data source selector and used by the API
+DATASETS = (DatasetRegistry.load(DATASETS_PATH)
+            if DATASETS_PATH and os.path.exists(DATASETS_PATH) else DatasetRegistry())
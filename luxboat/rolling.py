@@ -0,0 +1,341 @@
+"""
+Windowed and Exponentially Weighted Estimates
+=============================================
+calculate_due_date() weights all history equally. When throughput drifts
+(e.g. after a line change) recent observations should count more:
+
+- WindowedAccumulator keeps the statistics of the last `window`
+  observations, using StatsAccumulator.remove_oldest() for O(1) updates.
+- EWMAccumulator weights observation i of t by lambda^(t-i), with
+  lambda = 0.5 ** (1 / halflife), and updates in O(1) with the weighted
+  form of Welford's algorithm (West, 1979).
+
+Both expose summary(), so they can be passed anywhere a dataset is accepted
+by summarize() and calculate_due_date().
+
+rolling_summary() and rolling_due_dates() give the estimate after every
+observation (how the quote would have evolved over time) in one vectorized
+pass, from running weighted sums instead of one calculation per prefix.
+
+The weighted variance uses reliability weights, m2 / (W - W2 / W), and
+Summary.n is the effective sample size W^2 / W2. With lambda = 1 every
+statistic equals the unweighted one in luxboat.summary.
+"""
+
+from collections import deque
+
+import numpy as np
+
+from .accumulator import StatsAccumulator
+from .batch import due_date_from_summary
+from .summary import Summary
+
+
+# Largest growth factor allowed inside one block of _decayed_cumsum
+_MAX_SCALE = 1e200
+
+
+def decay_factor(halflife):
+    """Per-observation weight decay lambda for a halflife in observations."""
+    if not halflife > 0:
+        raise ValueError("halflife must be positive")
+    return 0.5 ** (1 / halflife)
+
+
+class WindowedAccumulator:
+    """Statistics of the most recent `window` observations, O(1) per update."""
+
+    def __init__(self, window, data=None):
+        if int(window) < 3:
+            raise ValueError("window must be at least 3 observations")
+        self.window = int(window)
+        self.values = deque()
+        self.acc = StatsAccumulator()
+        if data is not None:
+            self.extend(data)
+
+    def append(self, x):
+        x = float(x)
+        self.values.append(x)
+        self.acc.append(x)
+        if len(self.values) > self.window:
+            self.values.popleft()
+            self.acc.remove_oldest(following=self.values[0])
+
+    def extend(self, data):
+        values = np.asarray(data, dtype=float).ravel()
+        if values.size >= self.window:
+            # Older values would only be added and removed again
+            tail = values[-self.window:]
+            self.values = deque(tail.tolist())
+            self.acc = StatsAccumulator(tail)
+        else:
+            for x in values:
+                self.append(x)
+        return self
+
+    def __len__(self):
+        return len(self.values)
+
+    def summary(self):
+        return self.acc.summary()
+
+    def __repr__(self):
+        return f"WindowedAccumulator(window={self.window}, n={len(self)})"
+
+
+class EWMAccumulator:
+    """
+    Exponentially weighted mean, variance and lag-1 autocorrelation.
+
+    Each append decays all earlier weights by lambda and adds the new
+    observation with weight 1. The lag-1 pair (x[i-1], x[i]) gets the weight
+    of x[i].
+    """
+
+    def __init__(self, halflife, data=None):
+        self.halflife = float(halflife)
+        self.decay = decay_factor(halflife)
+        self.n = 0
+        self.last = None
+
+        # Series: weight sum, sum of squared weights, mean, weighted M2
+        self.weight = 0.0
+        self.weight2 = 0.0
+        self._mean = 0.0
+        self.m2 = 0.0
+
+        # Lag-1 pairs: head = x[:-1], tail = x[1:]
+        self.pair_weight = 0.0
+        self.head_mean = 0.0
+        self.tail_mean = 0.0
+        self.head_m2 = 0.0
+        self.tail_m2 = 0.0
+        self.cross = 0.0
+
+        if data is not None:
+            self.extend(data)
+
+    def append(self, x):
+        """Add one new observation in O(1)."""
+        x = float(x)
+        d = self.decay
+
+        if self.n:
+            a, b = self.last, x
+            self.pair_weight = d * self.pair_weight + 1
+            da = a - self.head_mean
+            db = b - self.tail_mean
+            self.head_mean += da / self.pair_weight
+            self.tail_mean += db / self.pair_weight
+            self.head_m2 = d * self.head_m2 + da * (a - self.head_mean)
+            self.tail_m2 = d * self.tail_m2 + db * (b - self.tail_mean)
+            self.cross = d * self.cross + da * (b - self.tail_mean)
+
+        self.weight = d * self.weight + 1
+        self.weight2 = d * d * self.weight2 + 1
+        delta = x - self._mean
+        self._mean += delta / self.weight
+        self.m2 = d * self.m2 + delta * (x - self._mean)
+        self.n += 1
+        self.last = x
+
+    def extend(self, data):
+        """
+        Add a block of observations.
+
+        The block's weighted moments are computed with NumPy and merged in,
+        scaling the existing state by lambda ** len(block).
+        """
+        values = np.asarray(data, dtype=float).ravel()
+        if values.size == 0:
+            return self
+        self._merge_block(values)
+        return self
+
+    def _merge_block(self, values):
+        k = values.size
+        d = self.decay
+        w = d ** np.arange(k - 1, -1, -1, dtype=float)
+        scale = d ** k
+
+        block_weight = w.sum()
+        block_mean = np.dot(w, values) / block_weight
+        dev = values - block_mean
+        block_m2 = np.dot(w * dev, dev)
+
+        weight = scale * self.weight + block_weight
+        delta = block_mean - self._mean
+        self.m2 = (scale * self.m2 + block_m2
+                   + delta * delta * scale * self.weight * block_weight / weight)
+        self._mean += delta * block_weight / weight
+        self.weight = weight
+        self.weight2 = scale * scale * self.weight2 + np.dot(w, w)
+
+        # Pairs ending in the block, including (last, values[0])
+        if self.n:
+            head = np.concatenate([[self.last], values[:-1]])
+            tail, pw = values, w
+        else:
+            head, tail, pw = values[:-1], values[1:], w[1:]
+        if pw.size:
+            pair_block = pw.sum()
+            hm = np.dot(pw, head) / pair_block
+            tm = np.dot(pw, tail) / pair_block
+            dh, dt = head - hm, tail - tm
+            pair_weight = scale * self.pair_weight + pair_block
+            ch = hm - self.head_mean
+            ct = tm - self.tail_mean
+            f = scale * self.pair_weight * pair_block / pair_weight
+            self.head_m2 = scale * self.head_m2 + np.dot(pw * dh, dh) + ch * ch * f
+            self.tail_m2 = scale * self.tail_m2 + np.dot(pw * dt, dt) + ct * ct * f
+            self.cross = scale * self.cross + np.dot(pw * dh, dt) + ch * ct * f
+            self.head_mean += ch * pair_block / pair_weight
+            self.tail_mean += ct * pair_block / pair_weight
+            self.pair_weight = pair_weight
+
+        self.n += k
+        self.last = float(values[-1])
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def mean(self):
+        return self._mean
+
+    @property
+    def effective_n(self):
+        return self.weight * self.weight / self.weight2 if self.n else 0.0
+
+    @property
+    def variance(self):
+        denom = self.weight - self.weight2 / self.weight if self.n else 0.0
+        return self.m2 / denom if denom > 0 else np.nan
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    @property
+    def autocorr(self):
+        denom = np.sqrt(self.head_m2 * self.tail_m2)
+        return self.cross / denom if denom > 0 else np.nan
+
+    def summary(self):
+        """Snapshot of the weighted statistics as a Summary tuple."""
+        return Summary(self.effective_n, self.mean, self.variance, self.std,
+                       self.autocorr)
+
+    def __repr__(self):
+        return (f"EWMAccumulator(halflife={self.halflife:g}, n={self.n}, "
+                f"mean={self.mean:.4g}, variance={self.variance:.4g}, "
+                f"autocorr={self.autocorr:.4g})")
+
+
+# ----------------------------------------------------------------------
+# Rolling series
+# ----------------------------------------------------------------------
+
+def _decayed_cumsum(values, decay):
+    """
+    s[t] = decay * s[t-1] + values[t] along the last axis.
+
+    Within a block s[t] = decay^t * cumsum(values[i] / decay^i), so the
+    recursion is a few array operations per block; blocks are sized so the
+    1 / decay^i factors stay below _MAX_SCALE.
+    """
+    values = np.asarray(values, dtype=float)
+    if decay == 1:
+        return np.cumsum(values, axis=-1)
+    n = values.shape[-1]
+    block = max(1, int(np.log(_MAX_SCALE) / -np.log(decay)))
+    out = np.empty_like(values)
+    carry = np.zeros(values.shape[:-1])
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        powers = decay ** np.arange(stop - start, dtype=float)
+        chunk = np.cumsum(values[..., start:stop] / powers, axis=-1) * powers
+        chunk += carry[..., None] * (powers * decay)
+        out[..., start:stop] = chunk
+        carry = chunk[..., -1]
+    return out
+
+
+def _window_sum(values, window):
+    """Sum of the last `window` entries up to each position (fewer at the start)."""
+    total = np.cumsum(values, axis=-1)
+    if window < values.shape[-1]:
+        total[..., window:] -= total[..., :-window].copy()
+    return total
+
+
+def rolling_summary(data, window=None, halflife=None):
+    """
+    Summary of estimates after each observation, as arrays of length n.
+
+    window=N uses the last N observations, halflife=h exponential weights,
+    neither an expanding window over all history. Entries where fewer than
+    3 observations are available are NaN.
+    """
+    values = np.asarray(data, dtype=float)
+    if values.ndim != 1 or values.size < 3:
+        raise ValueError("need a 1-D series with at least 3 observations")
+    if window is not None and halflife is not None:
+        raise ValueError("give either window or halflife, not both")
+
+    # Center on the overall mean so the running raw sums do not cancel
+    x = values - values.mean()
+    head, tail = x[:-1], x[1:]
+
+    if halflife is not None:
+        decay = decay_factor(halflife)
+        series_sum = pair_sum = lambda v: _decayed_cumsum(v, decay)
+        weight2 = _decayed_cumsum(np.ones_like(x), decay * decay)
+    else:
+        window = values.size if window is None else int(window)
+        if window < 3:
+            raise ValueError("window must be at least 3 observations")
+        series_sum = lambda v: _window_sum(v, window)
+        # A window of N observations holds N - 1 pairs
+        pair_sum = lambda v: _window_sum(v, window - 1)
+
+    weight = series_sum(np.ones_like(x))
+    s1 = series_sum(x)
+    s2 = series_sum(x * x)
+    if halflife is None:
+        weight2 = weight
+
+    # Pair sums for position t cover the pairs ending at t; none at t = 0
+    pw, ph, pt, phh, ptt, pht = (
+        np.concatenate([[0.0], pair_sum(v)])
+        for v in (np.ones_like(tail), head, tail, head * head, tail * tail,
+                  head * tail))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = s1 / weight
+        m2 = np.maximum(s2 - s1 * mean, 0)
+        variance = m2 / (weight - weight2 / weight)
+        head_m2 = phh - ph * ph / pw
+        tail_m2 = ptt - pt * pt / pw
+        autocorr = (pht - ph * pt / pw) / np.sqrt(head_m2 * tail_m2)
+        n = weight * weight / weight2
+
+    early = np.arange(values.size) < 2
+    variance[early] = np.nan
+    autocorr[early] = np.nan
+    return Summary(n, mean + values.mean(), variance, np.sqrt(variance), autocorr)
+
+
+def rolling_due_dates(data, boats_needed, confidence_level, window=None,
+                      halflife=None):
+    """
+    The due date quoted after each observation (RESULT_DTYPE array of length n).
+
+    Same arguments as rolling_summary(); entry t is what
+    calculate_due_date() returns for the estimates available at time t.
+    """
+    summary = rolling_summary(data, window=window, halflife=halflife)
+    # Early estimates can have |rho| = 1 from only two or three pairs
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return due_date_from_summary(summary, boats_needed, confidence_level)
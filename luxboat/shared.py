@@ -0,0 +1,83 @@
+"""
+Shared Read-Only Datasets
+=========================
+Hundreds of sessions usually look at a handful of distinct datasets: the
+example data, the same pasted sample, the same uploaded file. SHARED_DATA
+keeps one read-only float64 array per distinct content (by fingerprint), and
+every session holding that content gets the same object.
+
+Entries are weak references: an array is released as soon as the last
+session using it goes away, so the store never grows on its own. The arrays
+are marked read-only, so a session cannot change data another session sees.
+"""
+
+import threading
+import weakref
+
+import numpy as np
+
+from .cache import count_lookup, fingerprint
+
+
+class SharedArrays:
+    """Content-addressed store of read-only float64 arrays."""
+
+    def __init__(self):
+        self._arrays = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def intern(self, data, key=None, owned=False):
+        """
+        Return (array, key) for data, reusing the stored array if the same
+        content is already held by another session.
+
+        key is the content fingerprint; pass it when it is already known.
+        owned=True means the caller gives up data (e.g. a freshly parsed
+        array), so it can be frozen in place instead of copied. Read-only
+        arrays such as memory maps are stored without copying.
+        """
+        if key is None:
+            key = fingerprint(data)
+        with self._lock:
+            array = self._arrays.get(key)
+            count_lookup(array is not None)
+            if array is not None:
+                self.hits += 1
+                return array, key
+            self.misses += 1
+
+            array = np.asarray(data, dtype=np.float64)
+            if array.flags.writeable:
+                if not owned and (array is data or array.base is not None):
+                    # Do not freeze an array the caller may still write to
+                    array = array.copy()
+                array.flags.writeable = False
+            self._arrays[key] = array
+            weakref.finalize(array, self._released)
+        return array, key
+
+    def _released(self):
+        self.evictions += 1
+
+    def __len__(self):
+        return len(self._arrays)
+
+    def nbytes(self):
+        return sum(a.nbytes for a in list(self._arrays.values()))
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self),
+            'maxsize': None,
+            'nbytes': self.nbytes(),
+        }
+
+
+# One store per process, shared by every session
+SHARED_DATA = SharedArrays()
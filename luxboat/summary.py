@@ -0,0 +1,48 @@
+"""
+Sufficient Statistics for Inter-Throughput Times
+=================================================
+The due date model only needs four numbers from the data: the number of
+observations, the mean, the sample variance and the lag-1 autocorrelation.
+Computing them once lets the other engines price many orders without
+rescanning the data.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from .kernels import FUSED_MIN_SIZE
+
+
+# Everything the due date formula needs to know about a dataset
+Summary = namedtuple('Summary', ['n', 'mean', 'variance', 'std', 'autocorr'])
+
+
+def summarize(data):
+    """
+    Compute the sufficient statistics of an inter-throughput series.
+
+    Matches calculate_statistics() and calculate_autocorrelation() in app.py:
+    sample variance (ddof=1) and the Pearson correlation of x[:-1] and x[1:].
+    data can also be a Summary or a StatsAccumulator. Series of
+    FUSED_MIN_SIZE values or more are reduced in one fused pass
+    (luxboat.kernels) instead of five.
+    """
+    if isinstance(data, Summary):
+        return data
+    if hasattr(data, 'summary'):
+        # Streaming accumulators already hold the statistics
+        return data.summary()
+
+    values = np.asarray(data, dtype=float)
+    if values.ndim != 1 or values.size < 3:
+        raise ValueError("need a 1-D series with at least 3 observations")
+    if values.size >= FUSED_MIN_SIZE:
+        from .accumulator import StatsAccumulator
+        return StatsAccumulator.from_array(values).summary()
+
+    mean_time = values.mean()
+    variance = values.var(ddof=1)
+    autocorr = np.corrcoef(values[:-1], values[1:])[0, 1]
+
+    return Summary(values.size, mean_time, variance, np.sqrt(variance), autocorr)
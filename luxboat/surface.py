@@ -0,0 +1,83 @@
+"""
+Precomputed Results Surface
+===========================
+The app's sliders only allow 50 boat counts (1-50) and 50 confidence levels
+(50-99%), so a dataset has just 2,500 possible results. ResultsSurface
+computes all of them in one vectorized pass when the dataset changes; a
+slider move is then an array lookup.
+
+Surfaces are immutable and shared between sessions through SURFACE_CACHE,
+keyed on the dataset fingerprint and the variance mode.
+"""
+
+import numpy as np
+
+from .acf import variance_multiplier as acf_variance_multiplier
+from .batch import due_date_from_summary
+from .cache import LRUCache, fingerprint
+from .summary import summarize
+
+
+BOATS = np.arange(1, 51)
+CONFIDENCE_PCT = np.arange(50, 100)
+
+# Fields of calculate_due_date()'s result dict
+RESULT_FIELDS = ('mean', 'std', 'variance', 'autocorr', 'mu_b', 'sigma_b',
+                 'z_score', 'due_date_hours', 'due_date_days', 'average_days',
+                 'safety_time_days')
+
+# Each surface is about 300 KB
+SURFACE_CACHE = LRUCache(maxsize=64)
+
+
+class ResultsSurface:
+    """Due date results for every (boats, confidence %) slider position."""
+
+    def __init__(self, results, boats=BOATS, confidence_pct=CONFIDENCE_PCT):
+        results.flags.writeable = False
+        self.results = results
+        self.boats = np.asarray(boats)
+        self.confidence_pct = np.asarray(confidence_pct)
+
+    @classmethod
+    def from_data(cls, data, boats=BOATS, confidence_pct=CONFIDENCE_PCT,
+                  variance_mode='lag1'):
+        """
+        Compute the whole grid; variance_mode is as in calculate_due_date().
+        """
+        boats = np.asarray(boats)
+        confidence_pct = np.asarray(confidence_pct)
+        multiplier = None
+        if variance_mode != 'lag1':
+            multiplier = acf_variance_multiplier(data, boats, window=variance_mode)[:, None]
+
+        results = due_date_from_summary(summarize(data), boats[:, None],
+                                        confidence_pct[None, :] / 100,
+                                        variance_multiplier=multiplier)
+        return cls(results, boats, confidence_pct)
+
+    def contains(self, boats, confidence_pct):
+        return (self.boats[0] <= boats <= self.boats[-1]
+                and self.confidence_pct[0] <= confidence_pct <= self.confidence_pct[-1]
+                and boats == int(boats) and confidence_pct == int(confidence_pct))
+
+    def lookup(self, boats, confidence_pct):
+        """Result dict (same fields as calculate_due_date) for one slider position."""
+        if not self.contains(boats, confidence_pct):
+            raise KeyError((boats, confidence_pct))
+        row = self.results[int(boats) - self.boats[0],
+                           int(confidence_pct) - self.confidence_pct[0]]
+        return {name: float(row[name]) for name in RESULT_FIELDS}
+
+    def field(self, name):
+        """One result field as a (boats x confidence) grid, e.g. for a heatmap."""
+        return self.results[name]
+
+
+def shared_surface(data, data_key=None, variance_mode='lag1', cache=SURFACE_CACHE):
+    """ResultsSurface for data, computed once per dataset and process."""
+    if data_key is None:
+        data_key = fingerprint(data)
+    return cache.get_or_compute(
+        (data_key, variance_mode),
+        lambda: ResultsSurface.from_data(data, variance_mode=variance_mode))
@@ -0,0 +1,136 @@
+"""
+Off-Loop Worker Pool
+====================
+Everything a Shiny session computes runs on the server's event loop, so one
+slow plot or simulation holds up the messages of every other session on
+that worker. WORKER_POOL runs such jobs on a bounded thread pool instead
+and lets the event loop await them.
+
+Bounds:
+
+- at most `workers` jobs run at once (LUXBOAT_WORKERS, default
+  min(4, CPU count); 0 runs jobs inline on the event loop as before),
+- at most `max_waiting` further jobs wait for a worker
+  (LUXBOAT_MAX_WAITING, default 4 per worker); callers beyond that wait
+  on the event loop before their job is even queued (backpressure),
+- an optional asyncio.Semaphore per caller (one per session in app.py,
+  LUXBOAT_SESSION_JOBS, default 2) so that one session cannot take every
+  worker.
+
+A job cancelled before it starts never runs. A job already running on a
+thread finishes (threads cannot be interrupted) but its result is
+discarded, and it keeps its worker until then.
+
+Threads rather than processes: the jobs are closures over session data,
+and they fill the process-wide caches (results, plots, surfaces) that
+every session shares. NumPy and Agg release the GIL for most of the work.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+WORKERS = int(os.environ.get('LUXBOAT_WORKERS', min(4, os.cpu_count() or 1)))
+MAX_WAITING = int(os.environ.get('LUXBOAT_MAX_WAITING', 4 * WORKERS))
+SESSION_JOBS = int(os.environ.get('LUXBOAT_SESSION_JOBS', 2))
+
+
+class WorkerPool:
+    """Bounded thread pool awaited from the event loop."""
+
+    def __init__(self, workers=WORKERS, max_waiting=MAX_WAITING):
+        self.workers = workers
+        self.max_waiting = max_waiting
+        self._executor = None
+        self._slots = None
+        self._loop = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.running = 0
+        self.waiting = 0
+
+    def _start(self):
+        # Created on first use; the slots belong to the running event loop
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers,
+                                                thread_name_prefix='luxboat')
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.workers + self.max_waiting)
+
+    async def run(self, func, *args, limit=None):
+        """
+        Await func(*args) on a worker thread.
+
+        limit is an optional asyncio.Semaphore held for the whole job (the
+        per-session bound).
+        """
+        if self.workers <= 0:
+            return func(*args)
+        self._start()
+
+        self.waiting += 1
+        try:
+            if limit is not None:
+                await limit.acquire()
+            try:
+                await self._slots.acquire()
+            except BaseException:
+                if limit is not None:
+                    limit.release()
+                raise
+        except BaseException:
+            self.cancelled += 1
+            raise
+        finally:
+            self.waiting -= 1
+
+        loop = self._loop
+
+        def finished(future):
+            # Called on the worker thread (or here if cancelled before it
+            # started); the slots belong to the event loop
+            loop.call_soon_threadsafe(self._release, limit, future.cancelled())
+
+        self.submitted += 1
+        future = self._executor.submit(self._call, func, args)
+        future.add_done_callback(finished)
+        return await asyncio.wrap_future(future)
+
+    def _call(self, func, args):
+        with self._lock:
+            self.running += 1
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    def _release(self, limit, cancelled):
+        if cancelled:
+            self.cancelled += 1
+        else:
+            self.completed += 1
+        self._slots.release()
+        if limit is not None:
+            limit.release()
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'max_waiting': self.max_waiting,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'cancelled': self.cancelled,
+            'running': self.running,
+            'waiting': self.waiting,
+        }
+
+
+# One pool per process, shared by every session
+WORKER_POOL = WorkerPool()
@@ -0,0 +1,186 @@
+// Draws the JSON chart specs from luxboat/charts.py as SVG.
+// Any element with class "luxchart" and a data-spec attribute is drawn
+// when it is added to the page (Shiny replaces outputs on every update).
+(function () {
+  "use strict";
+
+  var NS = "http://www.w3.org/2000/svg";
+  var WIDTH = 800;
+  var MARGIN = { left: 64, right: 20, top: 40, bottom: 52 };
+
+  function el(name, attrs, parent) {
+    var node = document.createElementNS(NS, name);
+    for (var key in attrs) node.setAttribute(key, attrs[key]);
+    if (parent) parent.appendChild(node);
+    return node;
+  }
+
+  function text(parent, x, y, content, attrs) {
+    var node = el("text", Object.assign({ x: x, y: y, "font-size": 12,
+      "font-family": "sans-serif" }, attrs || {}), parent);
+    node.textContent = content;
+    return node;
+  }
+
+  function finite(values) {
+    return values.filter(function (v) { return v !== null && isFinite(v); });
+  }
+
+  function extent(spec) {
+    var xs = [], ys = [];
+    spec.marks.forEach(function (m) {
+      if (m.type === "bars") {
+        xs = xs.concat(m.edges);
+        ys = ys.concat(m.heights, [0]);
+      } else if (m.type === "line" || m.type === "area") {
+        xs = xs.concat(m.x);
+        ys = ys.concat(m.y);
+        if (m.type === "area") ys.push(0);
+      } else if (m.type === "vline") {
+        xs.push(m.x);
+      } else if (m.type === "hline") {
+        ys.push(m.y);
+      } else if (m.type === "errorbar") {
+        xs.push(m.low, m.high);
+        ys.push(m.y);
+      }
+    });
+    xs = finite(xs);
+    ys = finite(ys);
+    var x0 = Math.min.apply(null, xs), x1 = Math.max.apply(null, xs);
+    var y0 = Math.min.apply(null, ys), y1 = Math.max.apply(null, ys);
+    var pad = (y1 - y0 || 1) * 0.05;
+    return [x0, x1 > x0 ? x1 : x0 + 1, y0 < 0 || y0 > 0 ? y0 - pad : 0, y1 + pad];
+  }
+
+  function ticks(lo, hi, count) {
+    var raw = (hi - lo) / count;
+    var step = Math.pow(10, Math.floor(Math.log10(raw)));
+    if (raw / step > 5) step *= 10; else if (raw / step > 2) step *= 5;
+    else if (raw / step > 1) step *= 2;
+    var out = [];
+    for (var t = Math.ceil(lo / step) * step; t <= hi + step * 1e-9; t += step) {
+      out.push(Math.abs(t) < step * 1e-9 ? 0 : t);
+    }
+    return out;
+  }
+
+  function label(value) {
+    return Math.abs(value) >= 1e4 || (value !== 0 && Math.abs(value) < 1e-3)
+      ? value.toExponential(1) : String(+value.toPrecision(4));
+  }
+
+  function path(xs, ys, sx, sy) {
+    var d = "", pen = false;
+    for (var i = 0; i < xs.length; i++) {
+      if (ys[i] === null || xs[i] === null) { pen = false; continue; }
+      d += (pen ? "L" : "M") + sx(xs[i]).toFixed(1) + "," + sy(ys[i]).toFixed(1);
+      pen = true;
+    }
+    return d;
+  }
+
+  function draw(container, spec) {
+    var height = Math.round(WIDTH * spec.aspect[1] / spec.aspect[0]);
+    var svg = el("svg", { viewBox: "0 0 " + WIDTH + " " + height,
+      width: "100%", role: "img" });
+    var ext = extent(spec);
+    var left = MARGIN.left, right = WIDTH - MARGIN.right;
+    var top = MARGIN.top, bottom = height - MARGIN.bottom;
+    var sx = function (x) { return left + (x - ext[0]) / (ext[1] - ext[0]) * (right - left); };
+    var sy = function (y) { return bottom - (y - ext[2]) / (ext[3] - ext[2]) * (bottom - top); };
+
+    // Grid and axes
+    var grid = el("g", { stroke: "#ddd", "stroke-width": 1 }, svg);
+    ticks(ext[0], ext[1], 8).forEach(function (t) {
+      el("line", { x1: sx(t), x2: sx(t), y1: top, y2: bottom }, grid);
+      text(svg, sx(t), bottom + 16, label(t), { "text-anchor": "middle" });
+    });
+    ticks(ext[2], ext[3], 6).forEach(function (t) {
+      el("line", { x1: left, x2: right, y1: sy(t), y2: sy(t) }, grid);
+      text(svg, left - 6, sy(t) + 4, label(t), { "text-anchor": "end" });
+    });
+    el("rect", { x: left, y: top, width: right - left, height: bottom - top,
+      fill: "none", stroke: "#333" }, svg);
+
+    var plot = el("g", {}, svg);
+    var legend = [];
+    spec.marks.forEach(function (m) {
+      var dash = m.dash ? "6 4" : "none";
+      if (m.type === "bars") {
+        for (var i = 0; i < m.heights.length; i++) {
+          el("rect", { x: sx(m.edges[i]), y: sy(m.heights[i]),
+            width: Math.max(sx(m.edges[i + 1]) - sx(m.edges[i]), 0),
+            height: Math.max(sy(0) - sy(m.heights[i]), 0), fill: m.color,
+            "fill-opacity": m.opacity, stroke: "black" }, plot);
+        }
+      } else if (m.type === "line") {
+        el("path", { d: path(m.x, m.y, sx, sy), fill: "none", stroke: m.color,
+          "stroke-width": m.width, "stroke-dasharray": dash }, plot);
+        if (m.markers && m.x.length <= 200) {
+          m.x.forEach(function (x, i) {
+            if (m.y[i] !== null) el("circle", { cx: sx(x), cy: sy(m.y[i]), r: 3.5, fill: m.color }, plot);
+          });
+        }
+      } else if (m.type === "area") {
+        var d = path(m.x, m.y, sx, sy);
+        if (d) {
+          d += "L" + sx(m.x[m.x.length - 1]).toFixed(1) + "," + sy(0).toFixed(1) +
+               "L" + sx(m.x[0]).toFixed(1) + "," + sy(0).toFixed(1) + "Z";
+          el("path", { d: d, fill: m.color, "fill-opacity": m.opacity, stroke: "none" }, plot);
+        }
+      } else if (m.type === "vline") {
+        el("line", { x1: sx(m.x), x2: sx(m.x), y1: top, y2: bottom, stroke: m.color,
+          "stroke-width": 2, "stroke-dasharray": dash }, plot);
+      } else if (m.type === "hline") {
+        el("line", { x1: left, x2: right, y1: sy(m.y), y2: sy(m.y), stroke: m.color,
+          "stroke-width": 2, "stroke-dasharray": dash }, plot);
+      } else if (m.type === "errorbar") {
+        var y = sy(m.y);
+        el("line", { x1: sx(m.low), x2: sx(m.high), y1: y, y2: y, stroke: m.color,
+          "stroke-width": 2 }, plot);
+        [m.low, m.high].forEach(function (x) {
+          el("line", { x1: sx(x), x2: sx(x), y1: y - 6, y2: y + 6, stroke: m.color,
+            "stroke-width": 2 }, plot);
+        });
+        el("circle", { cx: sx(m.x), cy: y, r: 4, fill: m.color }, plot);
+      }
+      if (m.label) legend.push(m);
+    });
+
+    // Legend in the top right corner
+    if (legend.length) {
+      var box = el("g", {}, svg);
+      var lx = right - 230, ly = top + 8;
+      el("rect", { x: lx, y: ly, width: 222, height: legend.length * 18 + 8,
+        fill: "white", "fill-opacity": 0.85, stroke: "#ccc" }, box);
+      legend.forEach(function (m, i) {
+        var y = ly + 16 + i * 18;
+        el("line", { x1: lx + 8, x2: lx + 30, y1: y - 4, y2: y - 4, stroke: m.color,
+          "stroke-width": m.type === "bars" || m.type === "area" ? 8 : 2,
+          "stroke-dasharray": m.dash ? "6 4" : "none" }, box);
+        text(box, lx + 36, y, m.label);
+      });
+    }
+
+    text(svg, WIDTH / 2, 24, spec.title, { "text-anchor": "middle", "font-size": 15, "font-weight": "bold" });
+    text(svg, (left + right) / 2, height - 12, spec.xlabel, { "text-anchor": "middle" });
+    text(svg, 16, (top + bottom) / 2, spec.ylabel, { "text-anchor": "middle",
+      transform: "rotate(-90 16 " + (top + bottom) / 2 + ")" });
+
+    container.replaceChildren(svg);
+  }
+
+  function drawAll(root) {
+    var nodes = root.querySelectorAll(".luxchart[data-spec]");
+    Array.prototype.forEach.call(nodes, function (node) {
+      if (node.dataset.drawn) return;
+      node.dataset.drawn = "1";
+      draw(node, JSON.parse(node.dataset.spec));
+    });
+  }
+
+  new MutationObserver(function () { drawAll(document); })
+    .observe(document.documentElement, { childList: true, subtree: true });
+  document.addEventListener("DOMContentLoaded", function () { drawAll(document); });
+})();
@@ -0,0 +1,226 @@
+"""
+Invariants of the streaming statistics, the rolling estimates and the due
+date inversion, each checked against a direct batch computation.
+
+Run with:  python -m pytest tests
+"""
+
+import numpy as np
+import pytest
+
+from luxboat import (
+    DataParseError,
+    StatsAccumulator,
+    due_date_from_summary,
+    max_boats_by_deadline,
+    parse_times,
+    rolling_summary,
+    summarize,
+)
+from luxboat.inverse import MAX_BOATS
+
+
+def ar1_series(n, rho=0.4, seed=0):
+    """Positive AR(1) inter-throughput times around 5 hours."""
+    rng = np.random.default_rng(seed)
+    noise = rng.normal(0, 1, n)
+    x = np.empty(n)
+    x[0] = noise[0]
+    for i in range(1, n):
+        x[i] = rho * x[i - 1] + noise[i]
+    return 5 + x
+
+
+def batch_moments(values):
+    """Mean, variance and lag-1 pair moments recomputed from scratch."""
+    head, tail = values[:-1], values[1:]
+    return {
+        'n': values.size,
+        'mean': values.mean(),
+        'variance': values.var(ddof=1),
+        'autocorr': np.corrcoef(head, tail)[0, 1],
+        'head_mean': head.mean(),
+        'tail_mean': tail.mean(),
+        'head_m2': ((head - head.mean()) ** 2).sum(),
+        'tail_m2': ((tail - tail.mean()) ** 2).sum(),
+        'cross': ((head - head.mean()) * (tail - tail.mean())).sum(),
+    }
+
+
+def assert_matches(acc, values):
+    expected = batch_moments(values)
+    assert acc.n == expected.pop('n')
+    assert acc.first == values[0] and acc.last == values[-1]
+    for name, value in expected.items():
+        assert getattr(acc, name) == pytest.approx(value, rel=1e-9, abs=1e-9), name
+
+
+# ----------------------------------------------------------------------
+# StatsAccumulator
+# ----------------------------------------------------------------------
+
+def test_append_matches_batch():
+    values = ar1_series(500)
+    acc = StatsAccumulator()
+    for i, x in enumerate(values):
+        acc.append(x)
+        if i >= 2:
+            assert_matches(acc, values[:i + 1])
+
+
+def test_extend_matches_batch():
+    values = ar1_series(1000, seed=1)
+    acc = StatsAccumulator()
+    for lo, hi in [(0, 1), (1, 3), (3, 200), (200, 201), (201, 1000)]:
+        acc.extend(values[lo:hi])
+    assert_matches(acc, values)
+    assert_matches(StatsAccumulator(values), values)
+
+
+@pytest.mark.parametrize('split', [1, 2, 3, 250, 998, 999])
+def test_merge_matches_batch(split):
+    values = ar1_series(1000, seed=2)
+    left = StatsAccumulator(values[:split])
+    right = StatsAccumulator(values[split:])
+    assert_matches(left.merge(right), values)
+    # Neither input is modified
+    assert (left.n, right.n) == (split, values.size - split)
+    assert (left.last, right.first) == (values[split - 1], values[split])
+
+
+def test_merge_with_empty():
+    values = ar1_series(50, seed=3)
+    acc = StatsAccumulator(values)
+    assert_matches(acc.merge(StatsAccumulator()), values)
+    assert_matches(StatsAccumulator().merge(acc), values)
+
+
+def test_remove_oldest_matches_batch():
+    values = ar1_series(300, seed=4)
+    acc = StatsAccumulator(values)
+    for start in range(1, values.size - 2):
+        acc.remove_oldest(values[start])
+        assert_matches(acc, values[start:])
+
+
+def test_sliding_window_matches_batch():
+    values = ar1_series(400, seed=5)
+    window = 30
+    acc = StatsAccumulator(values[:window])
+    for end in range(window, values.size):
+        acc.append(values[end])
+        acc.remove_oldest(values[end - window + 1])
+        assert_matches(acc, values[end - window + 1:end + 1])
+
+
+def test_remove_oldest_needs_following():
+    acc = StatsAccumulator([1.0, 2.0, 4.0])
+    with pytest.raises(ValueError):
+        acc.remove_oldest()
+    with pytest.raises(ValueError):
+        StatsAccumulator().remove_oldest()
+
+
+# ----------------------------------------------------------------------
+# rolling_summary
+# ----------------------------------------------------------------------
+
+@pytest.mark.parametrize('window', [None, 3, 10, 64])
+def test_rolling_summary_matches_prefixes(window):
+    values = ar1_series(200, seed=6)
+    rolling = rolling_summary(values, window=window)
+
+    assert np.isnan(rolling.variance[:2]).all()
+    assert np.isnan(rolling.autocorr[:2]).all()
+    for t in range(2, values.size):
+        start = 0 if window is None else max(0, t + 1 - window)
+        expected = summarize(values[start:t + 1])
+        for field in ('n', 'mean', 'variance', 'std', 'autocorr'):
+            assert getattr(rolling, field)[t] == pytest.approx(
+                getattr(expected, field), rel=1e-7, abs=1e-9), (t, field)
+
+
+def test_rolling_summary_rejects_bad_arguments():
+    values = ar1_series(20)
+    with pytest.raises(ValueError):
+        rolling_summary(values, window=2)
+    with pytest.raises(ValueError):
+        rolling_summary(values, window=5, halflife=3)
+    with pytest.raises(ValueError):
+        rolling_summary(values[:2])
+
+
+# ----------------------------------------------------------------------
+# max_boats_by_deadline
+# ----------------------------------------------------------------------
+
+def forward_search(summary, deadline_days, confidence_level):
+    """Largest b whose due date is within the deadline, counting up from 0."""
+    boats = 0
+    while due_date_from_summary(summary, boats + 1,
+                                confidence_level)['due_date_days'] <= deadline_days:
+        boats += 1
+    return boats
+
+
+@pytest.mark.parametrize('confidence_level', [0.5, 0.9, 0.99])
+@pytest.mark.parametrize('deadline_days', [0.1, 1, 7.5, 30, 90])
+def test_max_boats_matches_forward_search(deadline_days, confidence_level):
+    values = ar1_series(500, seed=7)
+    summary = summarize(values)
+    expected = forward_search(summary, deadline_days, confidence_level)
+    assert max_boats_by_deadline(values, deadline_days, confidence_level) == expected
+    assert max_boats_by_deadline(summary, deadline_days, confidence_level) == expected
+
+
+def test_max_boats_broadcasts():
+    values = ar1_series(500, seed=8)
+    deadlines = np.array([1, 7, 30])
+    boats = max_boats_by_deadline(values, deadlines, 0.9)
+    assert boats.dtype == np.int64
+    assert list(boats) == [max_boats_by_deadline(values, d, 0.9) for d in deadlines]
+
+
+def test_max_boats_rejects_overflow():
+    values = ar1_series(100, seed=9)
+    with pytest.raises(ValueError, match="deadline too long"):
+        max_boats_by_deadline(values, 1e300, 0.9)
+    with pytest.raises(ValueError, match="deadline too long"):
+        max_boats_by_deadline(values, 1e300, 0.9, variance_mode='bartlett')
+    # Just below the limit still answers with an exact integer
+    days = MAX_BOATS * summarize(values).mean / 24 / 2
+    assert 0 < max_boats_by_deadline(values, days, 0.9) <= MAX_BOATS
+
+
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+def test_max_boats_rejects_constant_data():
+    with pytest.raises(ValueError):
+        max_boats_by_deadline([2.0] * 10, 30, 0.9)
+
+
+# ----------------------------------------------------------------------
+# parse_times
+# ----------------------------------------------------------------------
+
+@pytest.mark.parametrize('text', ['', '   ', '\n\t\n', ',;, ;'])
+def test_parse_blank_text(text):
+    with pytest.raises(DataParseError, match="No values found"):
+        parse_times(text)
+    assert parse_times(text, min_count=0).size == 0
+
+
+def test_parse_mixed_separators():
+    values = parse_times("1.5, 2;3\n4\t5e0 ,6")
+    assert values.tolist() == [1.5, 2, 3, 4, 5, 6]
+
+
+@pytest.mark.parametrize('token', ['1e400', '-1e400', 'nan', 'inf', 'abc'])
+def test_parse_reports_bad_token(token):
+    with pytest.raises(DataParseError) as info:
+        parse_times(f"1, 2\n3 {token} 4")
+    assert info.value.bad_tokens == [(4, 2, 3, token)]
+
+
+def test_parse_too_few_values():
+    with pytest.raises(DataParseError, match="at least 3"):
+        parse_times("1, 2")